@@ -2,34 +2,25 @@ from nps_common import NPSCommon
 from demographic_module import DemographicModule
 from economic_module import EconomicModule
 from finance_module import FinanceModule, SubscriberModule, BenefitModule
-from visualization import (
-    save_results_to_csv,
-    create_financial_plots,
-    create_demographic_plots,
-)
+from tracing import stage
 from datetime import datetime
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import numpy as np
 import pandas as pd
 
-import matplotlib.font_manager as fm
-import matplotlib.pyplot as plt
-import platform
-
-system_name = platform.system()
-
-if system_name == "Windows":
-    plt.rc("font", family="Malgun Gothic")
-elif system_name == "Darwin":  # Mac
-    plt.rc("font", family="AppleGothic")
-else:  # Linux
-    plt.rc("font", family="NanumGothic")
-
-# 마이너스 기호 깨짐 방지
-plt.rc("axes", unicode_minus=False)
+# 시각화 모듈(matplotlib, seaborn)은 그래프를 그릴 때만 불러온다.
+# 한글 폰트 설정은 figure_cache.configure_fonts 참고
 
 
 now = datetime.now()
 timestamp = now.strftime("%d%H%M")
 
+POLICY_DIGITS = 12  # fingerprint의 정책변수 반올림 자릿수 (0.07 * 100 / 100 등의 오차 제거)
+
 
 class NationalPensionModel:
     def __init__(self):
@@ -39,27 +30,88 @@ class NationalPensionModel:
         self.common = NPSCommon()
         # 주요 모듈 초기화
         self.demographic = DemographicModule()  # 인구모듈
-        self.economic = EconomicModule()  # 경제모듈
+        self.economic = EconomicModule(self.common)  # 경제모듈
         self.subscriber = SubscriberModule(self.common)  # 가입자모듈
         self.benefit = BenefitModule(self.common)  # 급여모듈
         self.finance = FinanceModule(self.common)  # 재정모듈
 
+    def assumption_fingerprint(self):
+        """보험료율/소득대체율을 제외한 전체 가정의 해시 (결과 캐시 키용)"""
+        params = {
+            "common": self.common.common_params,
+            "demographic": self.demographic.params,
+            "economic": [self.economic.params, self.economic.base_values],
+            "subscriber": self.subscriber.params,
+            "benefit": {
+                k: v for k, v in self.benefit.params.items() if k != "income_replacement"
+            },
+            "finance": {
+                k: v for k, v in self.finance.params.items() if k != "contribution_rate"
+            },
+            "initial_reserve_fund": self.finance.initial_reserve_fund,
+            "initial_population": pd.util.hash_pandas_object(
+                self.demographic.population_structure, index=False
+            ).tolist(),
+            "years": [self.start_year, self.end_year],
+        }
+        canonical = json.dumps(_canonical(params), sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def policy_params(self):
+        """정책변수 (보험료율, 소득대체율, 비율 단위)"""
+        return {
+            "contribution_rate": self.finance.params["contribution_rate"],
+            "income_replacement": self.benefit.params["income_replacement"],
+        }
+
+    def fingerprint(self):
+        """정책변수까지 포함한 전체 가정의 해시 (추계 결과 캐시 키용)"""
+        policy = {
+            key: round(float(value), POLICY_DIGITS)
+            for key, value in self.policy_params().items()
+        }
+        canonical = json.dumps(
+            {"assumptions": self.assumption_fingerprint(), "policy": policy},
+            sort_keys=True,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
     def run_projection(self):
-        """재정추계 실행"""
+        """재정추계 실행 (단계별 시간은 tracing.enable()로 기록)"""
         results = []
         demographic_results = []  # 인구지표 저장용
 
+        with stage("run_projection"):
+            for record in self.iter_projection():
+                results.append(record["financial"])
+                demographic_results.append(record["demographic"])
+
+        return {
+            "financial_results": results,
+            "demographic_results": demographic_results,
+        }
+
+    def iter_projection(self):
+        """재정추계를 한 해씩 계산하여 연도별 결과를 차례로 반환하는 generator
+
+        {"year", "financial": 재정수지 결과, "demographic": 인구지표와 가입자 정보}를
+        yield하며, 중간에 멈추면 적립금(self.finance.reserve_fund)은 그 해까지 계산된
+        상태로 남는다.
+        """
         for year in range(self.start_year, self.end_year + 1):
             # 인구추계
-            population_data = self.demographic.project_population(year)
+            with stage("demographic", year=year):
+                population_data = self.demographic.project_population(year)
 
             # 거시경제변수 추계
-            economic_vars = self.economic.project_variables(year)
+            with stage("economic", year=year):
+                economic_vars = self.economic.project_variables(year)
 
             # 가입자 추계
-            subscribers = self.subscriber.project_subscribers(
-                year, population_data["population_structure"]
-            )
+            with stage("subscriber", year=year):
+                subscribers = self.subscriber.project_subscribers(
+                    year, population_data["population_structure"]
+                )
 
             # 인구지표와 가입자 정보를 통합
             demographic_data = population_data["indicators"].copy()
@@ -71,31 +123,228 @@ class NationalPensionModel:
                 }
             )
 
-            demographic_results.append(demographic_data)
-
             # 급여지출 추계
-            benefits = self.benefit.project_benefits(
-                year,
-                population_data["population_structure"],  # 인구구조 데이터 추가
-                subscribers,
-            )
+            with stage("benefit", year=year):
+                benefits = self.benefit.project_benefits(
+                    year,
+                    population_data["population_structure"],  # 인구구조 데이터 추가
+                    subscribers,
+                )
 
             # 재정수지 추계
-            financial_status = self.finance.project_balance(
-                year, subscribers, benefits, economic_vars
+            with stage("finance", year=year):
+                financial_status = self.finance.project_balance(
+                    year, subscribers, benefits, economic_vars
+                )
+
+            yield {
+                "year": year,
+                "financial": financial_status,
+                "demographic": demographic_data,
+            }
+
+    def project_base_paths(self):
+        """보험료율/소득대체율과 무관한 전 기간 추계 (인구, 거시경제, 가입자)"""
+        years = np.arange(self.start_year, self.end_year + 1)
+
+        # 인구추계 (연도 × 연령 총인구)
+        with stage("demographic"):
+            demographic = self.project_demographic_path(years)
+
+        with stage("economic"):
+            economic_vars = self.economic.project_variables_path(years)
+
+        with stage("subscriber"):
+            subscribers = self.subscriber.project_subscribers_path(
+                years, demographic["population"]
             )
 
-            results.append(financial_status)
         return {
-            "financial_results": results,
-            "demographic_results": demographic_results,
+            "years": years,
+            "population": demographic["population"],
+            "indicators": demographic["indicators"],
+            "economic_vars": economic_vars,
+            "subscribers": subscribers,
+        }
+
+    def project_demographic_path(self, years):
+        """연도 배열(기준연도부터)의 (연도 × 연령) 총인구와 연도별 인구지표"""
+        engine = self.demographic.get_engine(int(years[-1]))
+        engine.project(int(years[-1]))
+        return {
+            "population": engine.total[0, : len(years)],
+            "indicators": {
+                key: values[0, : len(years)]
+                for key, values in engine.indicators().items()
+            },
         }
 
+    def run_projection_columnar(self):
+        """재정추계 실행 (전 기간 배열 계산)
+
+        적립금 점화식을 제외한 모든 항목을 연도 배열로 한 번에 계산하고,
+        run_projection과 같은 열을 가진 DataFrame으로 반환한다.
+        """
+        base = self.project_base_paths()
+        years, subscribers = base["years"], base["subscribers"]
+
+        with stage("benefit"):
+            benefits = self.benefit.project_benefits_path(
+                years, base["population"], subscribers
+            )
+        with stage("finance"):
+            financial_status = self.finance.project_balance_path(
+                years, subscribers, benefits, base["economic_vars"]
+            )
+
+        return projection_frames(
+            years, base["indicators"], subscribers, financial_status
+        )
+
+
+def projection_frames(years, indicators, subscribers, financial_status):
+    """배열 추계 결과를 run_projection과 같은 열의 DataFrame으로 변환"""
+    demographic_results = pd.DataFrame(
+        {
+            "year": years,
+            **indicators,
+            **{
+                key: subscribers[key]
+                for key in [
+                    "total_subscribers",
+                    "total_income_nominal",
+                    "total_income_real",
+                ]
+            },
+        }
+    )
+
+    return {
+        "financial_results": pd.DataFrame(financial_status),
+        "demographic_results": demographic_results,
+    }
+
+
+def _canonical(value):
+    """dict 키(연도, 연령대 튜플 등)를 문자열로 바꾼 JSON 직렬화용 값"""
+    if isinstance(value, dict):
+        return {repr(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    return value
+
+
+def test_columnar_projection(rtol=1e-10):
+    """연도별 추계(run_projection)와 배열 추계(run_projection_columnar) 결과 비교"""
+    yearly = NationalPensionModel().run_projection()
+    columnar = NationalPensionModel().run_projection_columnar()
+
+    for key in ["financial_results", "demographic_results"]:
+        expected = pd.DataFrame(yearly[key])
+        actual = columnar[key]
+        assert list(actual.columns) == list(expected.columns), key
+        for column in expected.columns:
+            np.testing.assert_allclose(
+                actual[column].to_numpy(dtype=float),
+                expected[column].to_numpy(dtype=float),
+                rtol=rtol,
+                err_msg=f"{key}.{column}",
+            )
+    print("배열 추계 결과가 연도별 추계 결과와 일치합니다.")
+
+
+def test_params_change_rebuilds_projection():
+    """같은 모델에서 인구가정을 바꿔 다시 추계하면 새 모델의 결과와 같은지 확인"""
+    fertility = {2023: 2.0, 2070: 2.0}
+    model = NationalPensionModel()
+    model.run_projection()
+    model.run_projection_columnar()
+    model.demographic.params["fertility_rate"] = dict(fertility)
+
+    fresh = NationalPensionModel()
+    fresh.demographic.params["fertility_rate"] = dict(fertility)
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(model.run_projection()["demographic_results"]),
+        pd.DataFrame(fresh.run_projection()["demographic_results"]),
+    )
+    expected = NationalPensionModel()
+    expected.demographic.params["fertility_rate"] = dict(fertility)
+    expected = expected.run_projection_columnar()
+    actual = model.run_projection_columnar()
+    for key in ["financial_results", "demographic_results"]:
+        pd.testing.assert_frame_equal(actual[key], expected[key])
+
+    # dict를 제자리에서 수정해도 다시 추계
+    model.demographic.params["fertility_rate"][2070] = 1.0
+    fresh = NationalPensionModel()
+    fresh.demographic.params["fertility_rate"] = {2023: 2.0, 2070: 1.0}
+    pd.testing.assert_frame_equal(
+        model.run_projection_columnar()["demographic_results"],
+        fresh.run_projection_columnar()["demographic_results"],
+    )
+    print("인구가정을 바꾸면 추계엔진을 다시 만듭니다.")
+
+
+HEAVY_MODULES = ("matplotlib", "seaborn", "visualization")
+
+
+def measure_import_time(modules=("NPS_model", "simulation")):
+    """새 인터프리터에서 모듈 import 시간(초)과 함께 불러와진 시각화 모듈 측정"""
+    code = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {', '.join(modules)}\n"
+        "print(time.perf_counter() - t)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout.splitlines()
+    return {
+        "modules": list(modules),
+        "seconds": float(output[0]),
+        "heavy_modules": [m for m in output[1].split(",") if m],
+    }
+
+
+def test_lazy_imports():
+    """추계 모듈 import 시 시각화 라이브러리를 불러오지 않는지 확인"""
+    result = measure_import_time()
+    assert result["heavy_modules"] == [], result["heavy_modules"]
+    print(f"{', '.join(result['modules'])} import 시간: {result['seconds']:.3f}초")
+
 
 if __name__ == "__main__":
+    from projection_cache import ProjectionCache
+    from results_io import ResultsWriter, has_pyarrow
+    from visualization import (
+        save_results_to_csv,
+        create_financial_plots,
+        create_demographic_plots,
+    )
+
     nps = NationalPensionModel()
-    rs = nps.run_projection()
+    # 같은 가정의 이전 결과가 있으면 다시 계산하지 않음 (--no-cache: 항상 계산)
+    if "--no-cache" in sys.argv:
+        rs = nps.run_projection()
+    else:
+        rs = ProjectionCache.from_env().run(nps)
 
-    save_results_to_csv(rs)
+    # pyarrow가 있으면 열 단위 파일로 저장 (CSV는 --csv 옵션이거나 pyarrow가 없을 때)
+    columnar = has_pyarrow()
+    if columnar:
+        ResultsWriter(f"results/projection_{timestamp}").write_projection(
+            rs,
+            contribution_rate=nps.finance.params["contribution_rate"] * 100,
+            income_replacement=nps.benefit.params["income_replacement"] * 100,
+        )
+    if not columnar or "--csv" in sys.argv:
+        save_results_to_csv(rs)
     create_financial_plots(rs)
     create_demographic_plots(rs)
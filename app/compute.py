@@ -0,0 +1,167 @@
+import base64
+
+from figure_cache import FigureCache
+from NPS_model import NationalPensionModel
+from projection_cache import ProjectionCache
+
+# 결과 그래프 캐시 (같은 연도별 결과면 다시 그리지 않음)
+figure_cache = FigureCache(maxsize=256)
+
+# 추계 결과 디스크 캐시 (워커 프로세스와 서버 재시작 간 공유)
+projection_cache = ProjectionCache.from_env()
+
+
+def project_scenario(contribution_rate, income_replacement):
+    """재정추계 실행 (프로세스 풀 작업), 연도별 재정 결과 list 반환"""
+    model = NationalPensionModel()
+    model.finance.params["contribution_rate"] = (
+        contribution_rate / 100
+    )  # 퍼센트를 비율로 변환
+    model.benefit.params["income_replacement"] = income_replacement / 100
+    results = projection_cache.run(model)
+    return results["financial_results"]
+
+
+def project_series(contribution_rate, income_replacement):
+    """전 기간 배열 추계 결과를 필드별 list로 반환 (프로세스 풀 작업)"""
+    model = NationalPensionModel()
+    model.finance.params["contribution_rate"] = contribution_rate / 100
+    model.benefit.params["income_replacement"] = income_replacement / 100
+    results = projection_cache.run(model, columnar=True)
+
+    series = {}
+    for key in ["financial_results", "demographic_results"]:
+        for column, values in results[key].items():
+            series[column] = values.tolist()
+    return series
+
+
+def find_milestones(years, reserve_funds):
+    """적립금(조원) 경로의 최대 적립금, 적자전환, 기금 고갈 시점"""
+    # 최대 적립금 시점 찾기
+    max_reserve_idx = reserve_funds.index(max(reserve_funds))
+
+    # 적자전환 시점 찾기 (전년대비 감소 시작점)
+    deficit_idx = next(
+        (
+            i
+            for i in range(1, len(reserve_funds))
+            if reserve_funds[i] < reserve_funds[i - 1]
+        ),
+        None,
+    )
+
+    # 기금 고갈 시점 찾기
+    depletion_idx = next((i for i, x in enumerate(reserve_funds) if x <= 0), None)
+
+    return {
+        "max_reserve_idx": max_reserve_idx,
+        "max_reserve": reserve_funds[max_reserve_idx],
+        "deficit_idx": deficit_idx,
+        "deficit_year": None if deficit_idx is None else years[deficit_idx],
+        "depletion_year": None if depletion_idx is None else years[depletion_idx],
+    }
+
+
+def render_result(financial_results):
+    """주요 지표와 그래프 이미지(base64 PNG) 반환 (스레드 풀 작업)
+
+    pyplot 전역 상태를 쓰지 않고 요청마다 독립된 Figure를 만들어 스레드에서 안전하다.
+    같은 결과의 그래프는 figure_cache에서 다시 그리지 않고 가져온다.
+    """
+    years = [r["year"] for r in financial_results]
+    reserve_funds = [
+        r["nominal_reserve_fund"] / 100000000 for r in financial_results
+    ]  # 조원 단위로 변환
+    milestones = find_milestones(years, reserve_funds)
+
+    data = {
+        "years": years,
+        "reserve_funds": reserve_funds,
+        "nominal_revenue": [r["nominal_revenue"] / 100000000 for r in financial_results],
+        "nominal_expenditure": [
+            r["nominal_expenditure"] / 100000000 for r in financial_results
+        ],
+        "milestones": milestones,
+    }
+    content = figure_cache.render(
+        _draw_result, data, {"figsize": (10, 12)}, bbox_inches="tight"
+    )
+
+    return {
+        "image": base64.b64encode(content).decode(),
+        "max_reserve": milestones["max_reserve"],
+        "depletion_year": milestones["depletion_year"],
+        "deficit_year": milestones["deficit_year"],
+    }
+
+
+def _draw_result(fig, data, style):
+    ax1, ax2 = fig.subplots(2, 1)
+
+    years = data["years"]
+    reserve_funds = data["reserve_funds"]
+    milestones = data["milestones"]
+    max_reserve_idx = milestones["max_reserve_idx"]
+    max_reserve_year = years[max_reserve_idx]
+    max_reserve = milestones["max_reserve"]
+    deficit_idx = milestones["deficit_idx"]
+    deficit_year = milestones["deficit_year"]
+    depletion_year = milestones["depletion_year"]
+
+    # 첫 번째 그래프 (적립금 추이)
+    ax1.plot(years, reserve_funds, marker="o")
+
+    # 최대 적립금 표시
+    ax1.annotate(
+        f"최대 적립금\n{max_reserve_year}년\n{max_reserve:.1f}조원",
+        xy=(max_reserve_year, max_reserve),
+        xytext=(10, 30),
+        textcoords="offset points",
+        ha="left",
+        va="bottom",
+        bbox=dict(boxstyle="round,pad=0.5", fc="yellow", alpha=0.5),
+        arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
+    )
+
+    # 적자전환 시점 표시
+    if deficit_year is not None and deficit_idx is not None:
+        ax1.annotate(
+            f"적자전환\n{deficit_year}년",
+            xy=(deficit_year, reserve_funds[deficit_idx]),
+            xytext=(-10, -30),
+            textcoords="offset points",
+            ha="right",
+            va="top",
+            bbox=dict(boxstyle="round,pad=0.5", fc="orange", alpha=0.5),
+            arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
+        )
+
+    # 기금 고갈 시점 표시
+    if depletion_year is not None:
+        ax1.annotate(
+            f"기금고갈\n{depletion_year}년",
+            xy=(depletion_year, 0),
+            xytext=(10, -30),
+            textcoords="offset points",
+            ha="left",
+            va="top",
+            bbox=dict(boxstyle="round,pad=0.5", fc="red", alpha=0.5),
+            arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
+        )
+
+    ax1.set_title("연도별 적립금 추이", loc="left")
+    ax1.set_xlabel("연도")
+    ax1.set_ylabel("적립금 (조원)")
+    ax1.grid(True)
+
+    # 두 번째 그래프 (수입-지출 추이)
+    ax2.plot(years, data["nominal_revenue"], marker="o", label="총수입")
+    ax2.plot(years, data["nominal_expenditure"], marker="o", label="총지출")
+    ax2.set_title("연도별 수입-지출 추이")
+    ax2.set_xlabel("연도")
+    ax2.set_ylabel("금액 (조원)")
+    ax2.legend()
+    ax2.grid(True)
+
+    fig.tight_layout()
@@ -1,15 +1,61 @@
-from fastapi import FastAPI, Request, Form
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import FastAPI, Request, Form, Query
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
-import matplotlib.pyplot as plt
-import io
-import base64
+import asyncio
+import math
+import multiprocessing
+import os
 from pathlib import Path
 
 from NPS_model import NationalPensionModel
+from app.compute import find_milestones, project_scenario, project_series, render_result
+from app.result_cache import ResultCache
 
-app = FastAPI()
+DEFAULT_SCENARIO = (9.0, 40.0)  # 기본가정 (보험료율 %, 소득대체율 %)
+DEFAULT_FIELDS = ["nominal_reserve_fund", "nominal_revenue", "nominal_expenditure"]
+
+# 동시 계산 제한: 초과 요청은 QUEUE_TIMEOUT초 대기 후 429 응답
+PROJECTION_WORKERS = int(os.environ.get("NPS_PROJECTION_WORKERS", 2))
+RENDER_WORKERS = int(os.environ.get("NPS_RENDER_WORKERS", 2))
+MAX_CONCURRENT = int(os.environ.get("NPS_MAX_CONCURRENT", 4))
+QUEUE_TIMEOUT = float(os.environ.get("NPS_QUEUE_TIMEOUT", 10))
+
+# 결과 캐시 (정책 조합 + 가정 fingerprint -> 지표와 이미지)
+result_cache = ResultCache(maxsize=int(os.environ.get("NPS_RESULT_CACHE_SIZE", 256)))
+ASSUMPTION_FINGERPRINT = NationalPensionModel().assumption_fingerprint()
+
+projection_executor = None  # 재정추계용 프로세스 풀
+render_executor = None  # 그래프 렌더링용 스레드 풀
+compute_slots = None  # 동시 계산 수 제한 (asyncio.Semaphore)
+
+
+class ServerBusy(Exception):
+    """동시 계산 한도 초과로 대기시간 내에 계산을 시작하지 못한 경우"""
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global projection_executor, render_executor, compute_slots
+    projection_executor = ProcessPoolExecutor(
+        max_workers=PROJECTION_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    render_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS)
+    compute_slots = asyncio.Semaphore(MAX_CONCURRENT)
+
+    # 기본 시나리오 결과를 미리 계산
+    await get_series(*DEFAULT_SCENARIO)
+    await get_result(*DEFAULT_SCENARIO)
+    yield
+
+    projection_executor.shutdown(cancel_futures=True)
+    render_executor.shutdown(cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -26,126 +72,124 @@ async def calculate(
     contribution_rate: float = Form(...), income_replacement: float = Form(...)
 ):
     try:
-        model = NationalPensionModel()
-        model.finance.params["contribution_rate"] = (
-            contribution_rate / 100
-        )  # 퍼센트를 비율로 변환
-        model.benefit.params["income_replacement"] = income_replacement / 100
-        results = model.run_projection()
-        financial_results = results["financial_results"]
-
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 12))
-
-        years = [r["year"] for r in financial_results]
-        reserve_funds = [
-            r["nominal_reserve_fund"] / 100000000 for r in financial_results
-        ]  # 조원 단위로 변환
-
-        # 최대 적립금 시점 찾기
-        max_reserve_idx = reserve_funds.index(max(reserve_funds))
-        max_reserve_year = years[max_reserve_idx]
-        max_reserve = reserve_funds[max_reserve_idx]
-
-        # 적자전환 시점 찾기 (전년대비 감소 시작점)
-        try:
-            deficit_idx = next(
-                i
-                for i in range(1, len(reserve_funds))
-                if reserve_funds[i] < reserve_funds[i - 1]
-            )
-            deficit_year = years[deficit_idx]
-        except StopIteration:
-            # 적자전환이 발생하지 않는 경우
-            deficit_idx = None
-            deficit_year = None
-
-        # 기금 고갈 시점 찾기
-        try:
-            depletion_idx = next(i for i, x in enumerate(reserve_funds) if x <= 0)
-            depletion_year = years[depletion_idx]
-        except StopIteration:
-            # 고갈시점이 없는 경우
-            depletion_idx = None
-            depletion_year = None
-
-        # 첫 번째 그래프 (적립금 추이)
-        ax1.plot(years, reserve_funds, marker="o")
-
-        # 최대 적립금 표시
-        ax1.annotate(
-            f"최대 적립금\n{max_reserve_year}년\n{max_reserve:.1f}조원",
-            xy=(max_reserve_year, max_reserve),
-            xytext=(10, 30),
-            textcoords="offset points",
-            ha="left",
-            va="bottom",
-            bbox=dict(boxstyle="round,pad=0.5", fc="yellow", alpha=0.5),
-            arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
-        )
+        result = await get_result(contribution_rate, income_replacement)
+        return JSONResponse({"success": True, **result})
+
+    except ServerBusy as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=429)
+
+    except Exception as e:
+        return JSONResponse({"success": False, "error": str(e)})
 
-        # 적자전환 시점 표시
-        if deficit_year is not None and deficit_idx is not None:
-            ax1.annotate(
-                f"적자전환\n{deficit_year}년",
-                xy=(deficit_year, reserve_funds[deficit_idx]),
-                xytext=(-10, -30),
-                textcoords="offset points",
-                ha="right",
-                va="top",
-                bbox=dict(boxstyle="round,pad=0.5", fc="orange", alpha=0.5),
-                arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
-            )
 
-        # 기금 고갈 시점 표시
-        if depletion_year is not None:
-            ax1.annotate(
-                f"기금고갈\n{depletion_year}년",
-                xy=(depletion_year, 0),
-                xytext=(10, -30),
-                textcoords="offset points",
-                ha="left",
-                va="top",
-                bbox=dict(boxstyle="round,pad=0.5", fc="red", alpha=0.5),
-                arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
+@app.get("/api/projection")
+async def projection(
+    contribution_rate: float = 9.0,
+    income_replacement: float = 40.0,
+    fields: str = ",".join(DEFAULT_FIELDS),
+    precision: int = Query(4, ge=1, le=17),
+):
+    """연도별 추계 결과를 열 단위 JSON으로 반환 (fields: 쉼표 구분 열 이름, precision: 유효숫자)"""
+    try:
+        series = await get_series(contribution_rate, income_replacement)
+
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in series]
+        if unknown:
+            return JSONResponse(
+                {
+                    "success": False,
+                    "error": f"알 수 없는 필드: {', '.join(unknown)}",
+                    "available_fields": sorted(series),
+                },
+                status_code=400,
             )
 
-        ax1.set_title("연도별 적립금 추이", loc="left")
-        ax1.set_xlabel("연도")
-        ax1.set_ylabel("적립금 (조원)")
-        ax1.grid(True)
-
-        # 두 번째 그래프 (수입-지출 추이)
-        nominal_revenue = [r["nominal_revenue"] / 100000000 for r in financial_results]
-        nominal_expenditure = [
-            r["nominal_expenditure"] / 100000000 for r in financial_results
-        ]
-
-        ax2.plot(years, nominal_revenue, marker="o", label="총수입")
-        ax2.plot(years, nominal_expenditure, marker="o", label="총지출")
-        ax2.set_title("연도별 수입-지출 추이")
-        ax2.set_xlabel("연도")
-        ax2.set_ylabel("금액 (조원)")
-        ax2.legend()
-        ax2.grid(True)
-
-        plt.tight_layout()
-
-        # 이미지를 바이트로 변환
-        img_buf = io.BytesIO()
-        plt.savefig(img_buf, format="png", bbox_inches="tight")
-        plt.close()
-        img_buf.seek(0)
-        img_base64 = base64.b64encode(img_buf.getvalue()).decode()
+        years = series["year"]
+        reserve_funds = [x / 100000000 for x in series["nominal_reserve_fund"]]
+        milestones = find_milestones(years, reserve_funds)
 
         return JSONResponse(
             {
                 "success": True,
-                "image": img_base64,
-                "max_reserve": max_reserve,
-                "depletion_year": depletion_year,
-                "deficit_year": deficit_year,
+                "years": years,
+                "fields": {
+                    field: [_round_significant(x, precision) for x in series[field]]
+                    for field in selected
+                },
+                "max_reserve": milestones["max_reserve"],
+                "deficit_year": milestones["deficit_year"],
+                "depletion_year": milestones["depletion_year"],
             }
         )
 
+    except ServerBusy as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=429)
+
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)})
+
+
+def _round_significant(value, precision):
+    if not math.isfinite(value):
+        return None
+    return float(f"{value:.{precision}g}")
+
+
+@asynccontextmanager
+async def compute_slot():
+    """동시 계산 한도 내에서 실행 (QUEUE_TIMEOUT초 안에 자리가 없으면 ServerBusy)"""
+    try:
+        await asyncio.wait_for(compute_slots.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise ServerBusy("요청이 많아 계산을 시작하지 못했습니다. 잠시 후 다시 시도해주세요.")
+    try:
+        yield
+    finally:
+        compute_slots.release()
+
+
+def _cache_key(kind, contribution_rate, income_replacement):
+    return (
+        kind,
+        round(contribution_rate, 4),
+        round(income_replacement, 4),
+        ASSUMPTION_FINGERPRINT,
+    )
+
+
+async def get_result(contribution_rate, income_replacement):
+    """캐시된 지표/이미지 결과 반환 (같은 조합의 동시 요청은 한 번만 계산)"""
+
+    async def compute():
+        async with compute_slot():
+            loop = asyncio.get_running_loop()
+            financial_results = await loop.run_in_executor(
+                projection_executor,
+                project_scenario,
+                contribution_rate,
+                income_replacement,
+            )
+            return await loop.run_in_executor(
+                render_executor, render_result, financial_results
+            )
+
+    key = _cache_key("calculate", contribution_rate, income_replacement)
+    return await result_cache.get_or_compute(key, compute)
+
+
+async def get_series(contribution_rate, income_replacement):
+    """캐시된 연도별 추계 결과(필드별 list) 반환"""
+
+    async def compute():
+        async with compute_slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                projection_executor,
+                project_series,
+                contribution_rate,
+                income_replacement,
+            )
+
+    key = _cache_key("series", contribution_rate, income_replacement)
+    return await result_cache.get_or_compute(key, compute)
@@ -0,0 +1,93 @@
+import asyncio
+from collections import OrderedDict
+
+
+class ResultCache:
+    """크기 제한 LRU 결과 캐시 + 동일 키 동시 요청 병합(single-flight)
+
+    같은 키의 계산이 진행 중이면 새로 계산하지 않고 진행 중인 계산 결과를 기다린다.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._in_flight = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    async def get_or_compute(self, key, compute):
+        """key의 결과 반환, 없으면 compute()(코루틴 함수)로 계산 후 저장"""
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return self._results[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await compute()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 대기자가 없어도 경고가 남지 않도록 조회 처리
+            raise
+        except BaseException:  # 취소(CancelledError) 등: 대기자도 취소
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(result)
+        self._results[key] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+        return result
+
+    def stats(self):
+        return {
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+        }
+
+
+def test_result_cache_cancellation():
+    """계산 중인 요청이 취소되면 같은 키를 기다리던 요청도 끝나고 다음 요청은 다시 계산"""
+
+    async def scenario():
+        cache = ResultCache()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return 1
+
+        owner = asyncio.create_task(cache.get_or_compute("k", slow))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_compute("k", fast))
+        await asyncio.sleep(0)
+        owner.cancel()
+        for task in (owner, waiter):
+            try:
+                await asyncio.wait_for(task, timeout=1)
+            except asyncio.CancelledError:
+                pass
+            else:
+                raise AssertionError("취소된 계산의 결과를 반환했습니다.")
+        assert cache._in_flight == {}
+        assert await cache.get_or_compute("k", fast) == 1
+        assert (cache.misses, cache.coalesced) == (2, 1), cache.stats()
+
+    asyncio.run(scenario())
+    print("취소된 계산을 기다리던 요청이 멈추지 않습니다.")
@@ -0,0 +1,389 @@
+"""추계/시뮬레이션/웹 경로 성능 벤치마크
+
+사용법:
+    python benchmark.py                          # 전체 실행, 결과 표 출력
+    python benchmark.py --json bench.json        # 측정 결과를 JSON으로 저장
+    python benchmark.py --compare base.json      # 이전 결과 대비 속도 비교
+    python benchmark.py --only run_projection --repeat 10
+
+각 항목은 준비(setup) 시간을 제외한 실행 시간을 repeat회 측정하고,
+추계 결과가 저장소의 기준 CSV(csv/financial_results_실질.csv,
+csv/simulation_results.csv)와 일치하는지 함께 검사한다.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FINANCIAL_CSV = os.path.join(BASE_DIR, "csv", "financial_results_실질.csv")
+DEMOGRAPHIC_CSV = os.path.join(BASE_DIR, "csv", "demographic_results_실질.csv")
+SIMULATION_CSV = os.path.join(BASE_DIR, "csv", "simulation_results.csv")
+
+RTOL = 1e-9  # 기준 CSV 대비 허용 상대오차
+
+
+def _quiet(func, *args, **kwargs):
+    """표준출력을 버리고 실행 (시뮬레이션 진행 메시지 제외)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def bench_project_population():
+    from demographic_module import DemographicModule
+
+    def setup():
+        return DemographicModule()
+
+    def run(demographic):
+        return [demographic.project_population(year) for year in range(2023, 2094)]
+
+    return setup, run, None
+
+
+def bench_run_projection():
+    from NPS_model import NationalPensionModel
+
+    def setup():
+        return NationalPensionModel()
+
+    def run(model):
+        return model.run_projection()
+
+    return setup, run, check_projection
+
+
+def bench_run_projection_columnar():
+    from NPS_model import NationalPensionModel
+
+    def setup():
+        return NationalPensionModel()
+
+    def run(model):
+        return model.run_projection_columnar()
+
+    return setup, run, check_projection
+
+
+def bench_run_projection_cached():
+    """추계 결과 디스크 캐시 적중 (저장된 .npz 읽기)"""
+    import tempfile
+
+    from NPS_model import NationalPensionModel
+    from projection_cache import ProjectionCache
+
+    tmp = tempfile.TemporaryDirectory()
+    cache = ProjectionCache(tmp.name)
+    cache.run(NationalPensionModel())
+
+    def setup():
+        return NationalPensionModel()
+
+    def run(model):
+        return cache.run(model)
+
+    return setup, run, check_projection, tmp.cleanup
+
+
+def bench_run_single_simulation():
+    from simulation import run_single_simulation
+
+    return None, lambda _: run_single_simulation(0.09, 0.40), None
+
+
+def bench_run_multiple_simulations():
+    from simulation import run_multiple_simulations
+
+    def run(_):
+        return _quiet(run_multiple_simulations, save_csv=False)
+
+    return None, run, check_simulation
+
+
+def bench_run_policy_grid():
+    from simulation import policy_grid_to_frame, run_policy_grid
+
+    contribution_rates = [round(x, 2) for x in np.arange(0.07, 0.16, 0.01)]
+    income_replacements = [round(x, 2) for x in np.arange(0.40, 0.51, 0.01)]
+
+    def run(_):
+        grid = run_policy_grid(contribution_rates, income_replacements)
+        return policy_grid_to_frame(contribution_rates, income_replacements, grid)
+
+    return None, run, check_simulation
+
+
+def bench_run_return_monte_carlo():
+    """투자수익률 경로 10만 개 몬테카를로 (AR(1) 모형)"""
+    from simulation import run_return_monte_carlo
+
+    def run(_):
+        return run_return_monte_carlo(n_paths=100_000, return_model="ar1", seed=0)
+
+    return None, run, None
+
+
+def bench_run_scenario_batch():
+    """정책 × 출산율 × 수익률 72개 시나리오 (바뀐 단계만 다시 계산)"""
+    from NPS_model import NationalPensionModel
+    from scenario_executor import ScenarioExecutor
+
+    fertility = NationalPensionModel().demographic.params["fertility_rate"]
+    scenarios = [
+        {
+            "finance.contribution_rate": contribution_rate,
+            "benefit.income_replacement": income_replacement,
+            "demographic.fertility_rate": {y: v * shock for y, v in fertility.items()},
+            "finance.real_investment_return": {2023: real_return},
+        }
+        for contribution_rate in (0.09, 0.10, 0.11, 0.12)
+        for income_replacement in (0.40, 0.45)
+        for shock in (0.9, 1.0, 1.1)
+        for real_return in (0.02, 0.025, 0.03)
+    ]
+
+    def run(executor):
+        return executor.run_batch(scenarios)
+
+    return ScenarioExecutor, run, None
+
+
+def bench_calculate():
+    """/calculate 요청 (매번 다른 정책 조합이라 결과 캐시를 쓰지 않음)"""
+    return _calculate_case(cached=False)
+
+
+def bench_calculate_cached():
+    """/calculate 요청 (같은 정책 조합 반복, 결과 캐시 적중)"""
+    return _calculate_case(cached=True)
+
+
+def _calculate_case(cached):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    state = {"client": None, "count": 0}
+
+    def setup():
+        if state["client"] is None:
+            state["client"] = TestClient(app)
+            state["client"].__enter__()  # lifespan (풀 생성, 기본 시나리오 계산)
+        return state["client"]
+
+    def run(client):
+        state["count"] += 1
+        contribution_rate = 9.0 if cached else 9.0 + state["count"] * 0.001
+        response = client.post(
+            "/calculate",
+            data={
+                "contribution_rate": contribution_rate,
+                "income_replacement": 40.0,
+            },
+        )
+        result = response.json()
+        assert result["success"], result
+        return result
+
+    def teardown():
+        if state["client"] is not None:
+            state["client"].__exit__(None, None, None)
+
+    # 기준 CSV는 기본 시나리오(9%, 40%) 결과이므로 캐시 항목만 검사
+    return setup, run, check_calculate if cached else None, teardown
+
+
+def check_projection(rs):
+    """재정/인구 추계 결과와 기준 CSV 비교"""
+    failures = {}
+    for key, path in [
+        ("financial_results", FINANCIAL_CSV),
+        ("demographic_results", DEMOGRAPHIC_CSV),
+    ]:
+        expected = pd.read_csv(path, encoding="utf-8-sig")
+        actual = pd.DataFrame(rs[key])
+        failures.update(_compare_frames(key, actual, expected))
+    return failures
+
+
+def check_simulation(df):
+    """정책 조합별 시뮬레이션 결과와 기준 CSV 비교"""
+    expected = pd.read_csv(SIMULATION_CSV)
+    return _compare_frames("simulation_results", df, expected)
+
+
+def check_calculate(result):
+    """기본 시나리오 지표(기금 소진 연도 등)와 기준 CSV 비교"""
+    expected = pd.read_csv(FINANCIAL_CSV, encoding="utf-8-sig")
+    depleted = expected.loc[expected["nominal_reserve_fund"] <= 0, "year"]
+    if result["depletion_year"] != int(depleted.iloc[0]):
+        return {"depletion_year": f"{result['depletion_year']} != {depleted.iloc[0]}"}
+    return {}
+
+
+def _compare_frames(name, actual, expected):
+    failures = {}
+    missing = [column for column in expected.columns if column not in actual]
+    if missing or len(actual) != len(expected):
+        return {name: f"열 {missing} 누락 또는 행 수 {len(actual)} != {len(expected)}"}
+
+    for column in expected.columns:
+        a = actual[column].to_numpy(dtype=float)
+        e = expected[column].to_numpy(dtype=float)
+        if not np.allclose(a, e, rtol=RTOL, atol=0, equal_nan=True):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                error = np.nanmax(np.abs(a - e) / np.abs(e))
+            failures[f"{name}.{column}"] = f"최대 상대오차 {error:.3g}"
+    return failures
+
+
+# 이름: (벤치마크 생성 함수, 기본 반복 횟수)
+BENCHMARKS = {
+    "project_population": (bench_project_population, 5),
+    "run_projection": (bench_run_projection, 5),
+    "run_projection_columnar": (bench_run_projection_columnar, 20),
+    "run_projection_cached": (bench_run_projection_cached, 20),
+    "run_single_simulation": (bench_run_single_simulation, 10),
+    "run_multiple_simulations": (bench_run_multiple_simulations, 1),
+    "run_policy_grid": (bench_run_policy_grid, 10),
+    "run_return_monte_carlo": (bench_run_return_monte_carlo, 3),
+    "run_scenario_batch": (bench_run_scenario_batch, 5),
+    "calculate": (bench_calculate, 5),
+    "calculate_cached": (bench_calculate_cached, 20),
+}
+
+
+def run_benchmark(name, repeat=None):
+    """벤치마크 한 항목 실행: 반복 시간(초)과 결과 검사 반환"""
+    factory, default_repeat = BENCHMARKS[name]
+    setup, run, check, *rest = factory()
+    teardown = rest[0] if rest else None
+    repeat = repeat or default_repeat
+
+    times = []
+    output = None
+    try:
+        for _ in range(repeat):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            output = run(state)
+            times.append(time.perf_counter() - start)
+    finally:
+        if teardown:
+            teardown()
+
+    result = {
+        "repeat": repeat,
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+    }
+    if check is not None:
+        failures = check(output)
+        result["check"] = {"passed": not failures, "failures": failures}
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=BASE_DIR,
+        ).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "commit": commit or None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_all(names=None, repeat=None):
+    from NPS_model import measure_import_time
+
+    names = names or list(BENCHMARKS)
+    report = {
+        "environment": environment(),
+        "import": measure_import_time(),
+        "benchmarks": {},
+    }
+    for name in names:
+        report["benchmarks"][name] = run_benchmark(name, repeat)
+    return report
+
+
+def print_report(report, baseline=None):
+    imported = report["import"]
+    print(f"import {', '.join(imported['modules'])}: {imported['seconds']:.3f}s")
+    header = f"{'benchmark':<28}{'repeat':>7}{'min (s)':>12}{'median (s)':>12}{'check':>8}"
+    if baseline:
+        header += f"{'speedup':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for name, result in report["benchmarks"].items():
+        check = result.get("check")
+        status = "-" if check is None else ("ok" if check["passed"] else "FAIL")
+        line = (
+            f"{name:<28}{result['repeat']:>7}{result['min']:>12.4f}"
+            f"{result['median']:>12.4f}{status:>8}"
+        )
+        base = (baseline or {}).get("benchmarks", {}).get(name)
+        if base:
+            line += f"{base['median'] / result['median']:>9.2f}x"
+        print(line)
+        if check and not check["passed"]:
+            for key, message in check["failures"].items():
+                print(f"    {key}: {message}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="국민연금 재정추계 모형 성능 벤치마크")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="실행할 항목")
+    parser.add_argument("--repeat", type=int, help="반복 횟수 (기본: 항목별 설정)")
+    parser.add_argument("--json", help="측정 결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 측정 결과 JSON 파일 경로")
+    args = parser.parse_args(argv)
+
+    os.chdir(BASE_DIR)  # 웹 앱의 static/template 경로 기준
+    # 웹 앱 항목은 계산 시간을 재므로 추계 결과 디스크 캐시를 끔 (워커 프로세스에도 적용)
+    os.environ["NPS_PROJECTION_CACHE_MB"] = "0"
+    report = run_all(args.only, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    passed = all(
+        result.get("check", {"passed": True})["passed"]
+        for result in report["benchmarks"].values()
+    )
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
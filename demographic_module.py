@@ -1,11 +1,14 @@
+import copy
+import struct
+import zipfile
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from nps_common import AgeBucketIndex
 
-# 한글 폰트 설정
-plt.rcParams["font.family"] = "Malgun Gothic"  # 윈도우의 경우
-# plt.rcParams['font.family'] = 'AppleGothic'  # macOS의 경우
-plt.rcParams["axes.unicode_minus"] = False  # 마이너스 기호 깨짐 방지
+WORKING_AGE = (18, 64)  # 생산가능인구 연령대
+ELDERLY = (65, None)  # 고령인구 연령대
+INDICATOR_AGE_BUCKETS = AgeBucketIndex([WORKING_AGE, ELDERLY])
 
 
 class DemographicModule:
@@ -15,6 +18,8 @@ class DemographicModule:
         # self.population_structure = None  # 전체 인구
         # 보고서 참조
         self.population_structure = create_initial_population_2023()
+        self._engine = None  # 배열 기반 추계엔진 (연도별 인구구조 저장)
+        self._engine_params = None  # 추계엔진을 만들 때의 params (바뀌면 다시 만듦)
 
         self.working_age = None  # 생산가능인구 (18-64세)
         self.elderly = None  # 고령인구 (65세 이상)
@@ -53,15 +58,15 @@ class DemographicModule:
         population_structure = self._calculate_population_structure(year)
 
         # 2. 주요 인구지표 계산
+        band_totals = INDICATOR_AGE_BUCKETS.totals(
+            population_structure["age"].to_numpy(),
+            population_structure["total"].to_numpy(),
+        )
         demographic_indicators = {
             "year": year,
             "total_population": population_structure["total"].sum(),
-            "working_age_population": population_structure[
-                (population_structure["age"] >= 18) & (population_structure["age"] < 65)
-            ]["total"].sum(),
-            "elderly_population": population_structure[
-                population_structure["age"] >= 65
-            ]["total"].sum(),
+            "working_age_population": band_totals[WORKING_AGE],
+            "elderly_population": band_totals[ELDERLY],
         }
         demographic_indicators["elderly_dependency"] = (
             demographic_indicators["elderly_population"]
@@ -77,6 +82,9 @@ class DemographicModule:
     def _calculate_population_structure(self, year):
         """연령별/성별 인구구조 계산 (간단한 코호트 요인법)
 
+        배열 기반 추계엔진(CohortProjectionEngine)이 연도별 인구를 계산/저장하고,
+        DataFrame은 요청된 연도에 대해서만 생성한다.
+
         TODO :  더 정교한 연령별/성별 사망률 적용
             연령별 출산율 차등 적용
             연령별/성별 국제순이동 패턴 반영
@@ -85,59 +93,87 @@ class DemographicModule:
         if year == 2023:  # 기준연도는 초기 인구구조 반환
             return self.population_structure
 
-        # 이전 연도의 인구구조로부터 계산
-        prev_population_struct = self._calculate_population_structure(year - 1).copy()
+        return self.get_engine(year).to_frame(year)
 
-        # 1. 연령 증가 (모든 연령층을 1세 증가)
-        prev_population_struct["age"] += 1
+    def get_engine(self, end_year=2093):
+        """end_year까지 추계 가능한 배열 기반 추계엔진 반환
 
-        # 2. 사망률 적용 (간단한 연령별 사망률)
-        survival_rates = self._get_survival_rates(prev_population_struct["age"])
-        prev_population_struct["male"] *= survival_rates
-        prev_population_struct["female"] *= survival_rates
-
-        # 3. 출생아 수 계산
-        fertility_rate = self.get_fertility_rate(year)
-        fertile_women = prev_population_struct[
-            (prev_population_struct["age"] >= 15)
-            & (prev_population_struct["age"] <= 49)
-        ]["female"].sum()
+        초기 인구구조 객체나 params 내용이 엔진을 만들 때와 다르면 다시 만든다.
+        """
+        engine = self._engine
+        if (
+            engine is None
+            or engine.initial_structure is not self.population_structure
+            or engine.end_year < end_year
+            or self._engine_params != self.params
+        ):
+            engine = self._build_engine([self.params], max(end_year, 2093))
+            self._engine = engine
+            self._engine_params = copy.deepcopy(self.params)
+        return engine
+
+    def project_trajectory(self, end_year=2093, dtype=None):
+        """end_year까지의 연령별/성별 인구 궤적(PopulationTrajectory) 반환
+
+        dtype=np.float32로 주면 메모리를 절반으로 줄인다 (상대오차 약 1e-7).
+        """
+        engine = self.get_engine(end_year)
+        engine.project(end_year)
+        return PopulationTrajectory.from_engine(engine, end_year=end_year, dtype=dtype)
 
-        total_births = (
-            fertile_women * fertility_rate / (49 - 15 + 1)
-        )  # 합계출산율->연간 출생아수로 전환
+    def reset_projection(self):
+        """저장된 추계 결과 초기화"""
+        self._engine = None
+        self._engine_params = None
 
-        # 출생성비 적용
-        male_births = total_births * 0.5
-        female_births = total_births * 0.5
+    def project_scenarios(self, param_sets, end_year=2093):
+        """K개 인구가정(param_sets)을 한 번의 벡터화 추계로 계산
 
-        # 4. 신생아 행 추가
-        newborn_row = pd.DataFrame(
-            {
-                "age": [0],
-                "total": [male_births + female_births],
-                "male": [male_births],
-                "female": [female_births],
-            }
-        )
+        param_sets의 각 원소는 self.params와 같은 형식이며, 빠진 항목은 self.params 값을 쓴다.
+        반환값의 population은 (K × 연도 × 연령) 총인구 배열, indicators는 (K × 연도) 배열
+        """
+        param_sets = [{**self.params, **params} for params in param_sets]
+        engine = self._build_engine(param_sets, end_year)
+        engine.project(end_year)
 
-        # 5. 국제순이동 반영 (간단히 전체 인구에 비례하여 배분)
-        net_migration = self._get_net_migration(year)
-        migration_ratio = net_migration / prev_population_struct["total"].sum()
+        return {
+            "years": engine.years,
+            "population": engine.total,
+            "indicators": engine.indicators(),
+        }
 
-        prev_population_struct["male"] *= 1 + migration_ratio
-        prev_population_struct["female"] *= 1 + migration_ratio
+    def sample_params(self, n_draws, seed=None, scale=None):
+        """self.params 주변의 확률적 인구가정 n_draws개 생성
 
-        # 6. 최종 인구구조 생성
-        population_structure = pd.concat(
-            [newborn_row, prev_population_struct[prev_population_struct["age"] <= 200]]
-        )
-        population_structure["total"] = (
-            population_structure["male"] + population_structure["female"]
+        가정별로 상대충격 e ~ N(0, scale)을 하나씩 뽑아 전 기간 값에 (1 + e)를 곱한다.
+        """
+        if scale is None:
+            scale = {"fertility_rate": 0.1, "life_expectancy": 0.01, "net_migration": 0.2}
+        rng = np.random.default_rng(seed)
+
+        param_sets = []
+        for _ in range(n_draws):
+            params = dict(self.params)
+            for key, sigma in scale.items():
+                shock = 1 + rng.normal(0, sigma)
+                params[key] = {y: v * shock for y, v in self.params[key].items()}
+            param_sets.append(params)
+        return param_sets
+
+    def _build_engine(self, param_sets, end_year):
+        years = np.arange(2023, end_year + 1)
+        return CohortProjectionEngine(
+            self.population_structure,
+            start_year=2023,
+            survival_rates=self._get_survival_rates(np.arange(200 + 1)),
+            fertility_rates=np.array(
+                [self.get_fertility_rate(years, params) for params in param_sets]
+            ),
+            net_migration=np.array(
+                [self._get_net_migration(years, params) for params in param_sets]
+            ),
         )
 
-        return population_structure.reset_index(drop=True)
-
     def _get_survival_rates(self, ages):
         """간단한 연령별 생존률 계산"""
         # 0세: 0.995, 1-39세: 0.999, 40-69세: 0.995, 70-89세: 0.98, 90세 이상: 0.90
@@ -152,22 +188,305 @@ class DemographicModule:
 
         return survival_rates
 
-    def _get_net_migration(self, year):
+    def _get_net_migration(self, year, params=None):
         """특정 연도의 국제순이동자 수 반환"""
-        years = sorted(self.params["net_migration"].keys())
-        migration = [self.params["net_migration"][y] for y in years]
+        params = self.params if params is None else params
+        years = sorted(params["net_migration"].keys())
+        migration = [params["net_migration"][y] for y in years]
 
         return np.interp(year, years, migration) * 1000  # 천명 단위를 명 단위로 변환
 
-    def get_fertility_rate(self, year):
+    def get_fertility_rate(self, year, params=None):
         """특정 연도의 합계출산율 반환"""
         # 중간값은 선형보간
-        years = sorted(self.params["fertility_rate"].keys())
-        rates = [self.params["fertility_rate"][y] for y in years]
+        params = self.params if params is None else params
+        years = sorted(params["fertility_rate"].keys())
+        rates = [params["fertility_rate"][y] for y in years]
 
         return np.interp(year, years, rates)
 
 
+class CohortProjectionEngine:
+    """배열 기반 코호트 요인법 추계엔진
+
+    인구를 (시나리오 × 연령 × 성별) 배열로 보관하고, 연도별 투영행렬을 미리 계산해
+    모든 시나리오를 한 번에 1년씩 전진한다.
+    투영행렬은 생존률 부대각 띠(연령 증가 + 사망), 출생 행(15-49세 여성 × 출산율/35),
+    국제순이동 배율(전년도 총인구 대비)로 구성된다.
+    계산 결과는 (시나리오 × 연도 × 연령 × 성별) 배열에 저장되며
+    DataFrame은 요청 시에만 생성한다.
+    """
+
+    MALE, FEMALE = 0, 1
+
+    def __init__(
+        self,
+        initial_structure,
+        start_year,
+        survival_rates,
+        fertility_rates,
+        net_migration,
+        max_age=200,
+    ):
+        # 연도별 투영행렬 구성요소 (사전계산), 1차원이면 단일 시나리오
+        self.survival = survival_rates  # 연령별 생존률(띠)
+        self.fertility = np.atleast_2d(fertility_rates)  # (시나리오 × 연도) 합계출산율
+        self.migration = np.atleast_2d(net_migration)  # (시나리오 × 연도) 국제순이동자 수
+
+        self.initial_structure = initial_structure
+        self.start_year = start_year
+        self.max_age = max_age
+        n_scenarios, n_years = self.fertility.shape
+        self.end_year = start_year + n_years - 1
+        self.years = np.arange(start_year, self.end_year + 1)
+
+        # 인구, 연령별 총인구, 연도별 유효 연령 수
+        self.population = np.zeros((n_scenarios, n_years, max_age + 1, 2))
+        self.total = np.zeros((n_scenarios, n_years, max_age + 1))
+        self.n_ages = np.zeros(n_years, dtype=int)
+
+        ages = initial_structure["age"].to_numpy()
+        self.population[:, 0, ages, self.MALE] = initial_structure["male"].to_numpy()
+        self.population[:, 0, ages, self.FEMALE] = initial_structure["female"].to_numpy()
+        self.total[:, 0, ages] = initial_structure["total"].to_numpy()
+        self.n_ages[0] = ages.max() + 1
+        self.last_index = 0  # 계산이 완료된 마지막 연도 인덱스
+
+    def _step(self, t):
+        """t-1년 인구에 t년 투영행렬을 적용"""
+        n_prev = self.n_ages[t - 1]
+        n = min(n_prev + 1, self.max_age + 1)
+        prev = self.population[:, t - 1, :n_prev]
+        new = self.population[:, t]
+
+        # 1-2. 연령 증가 및 생존률 적용 (부대각 띠)
+        survived = prev[:, : n - 1] * self.survival[1:n, None]
+
+        # 3. 출생아 수 (생존 후 15-49세 여성 기준)
+        fertile_women = survived[:, 14:49, self.FEMALE].sum(axis=1)
+        total_births = fertile_women * self.fertility[:, t] / (49 - 15 + 1)
+
+        # 4. 국제순이동 배율 (전년도 총인구 대비)
+        migration_ratio = (
+            self.migration[:, t] / self.total[:, t - 1, :n_prev].sum(axis=1)
+        )
+
+        # 5. 국제순이동 반영 및 신생아 추가 (출생성비 0.5)
+        new[:, 1:n] = survived * (1 + migration_ratio)[:, None, None]
+        new[:, 0] = (total_births * 0.5)[:, None]
+        self.total[:, t, :n] = new[:, :n, self.MALE] + new[:, :n, self.FEMALE]
+        self.n_ages[t] = n
+
+    def project(self, year):
+        """year까지 추계하고 해당 연도 인덱스 반환"""
+        t = year - self.start_year
+        if t < 0 or year > self.end_year:
+            raise ValueError(f"추계 범위를 벗어난 연도: {year}")
+        for i in range(self.last_index + 1, t + 1):
+            self._step(i)
+        self.last_index = max(self.last_index, t)
+        return t
+
+    def indicators(self):
+        """계산된 연도의 (시나리오 × 연도) 주요 인구지표"""
+        total = self.total[:, : self.last_index + 1]
+        band_totals = INDICATOR_AGE_BUCKETS.trajectory_totals(total)
+        working_age = band_totals[..., INDICATOR_AGE_BUCKETS.band_index[WORKING_AGE]]
+        elderly = band_totals[..., INDICATOR_AGE_BUCKETS.band_index[ELDERLY]]
+
+        return {
+            "total_population": total.sum(axis=-1),
+            "working_age_population": working_age,
+            "elderly_population": elderly,
+            "elderly_dependency": elderly / working_age * 100,
+        }
+
+    def to_frame(self, year, scenario=0):
+        """해당 연도 인구구조를 DataFrame(age, total, male, female)으로 반환"""
+        t = self.project(year)
+        n = self.n_ages[t]
+        return pd.DataFrame(
+            {
+                "age": np.arange(n),
+                "total": self.total[scenario, t, :n],
+                "male": self.population[scenario, t, :n, self.MALE],
+                "female": self.population[scenario, t, :n, self.FEMALE],
+            }
+        )
+
+
+class PopulationTrajectory:
+    """연도별 연령/성별 인구 궤적 (연도 × 연령 × 성별 연속 배열)
+
+    연도별 DataFrame 대신 하나의 배열에 담아 연도/연령으로 조회한다.
+    인구피라미드(pyramid), 출생 코호트(cohort), 연령 구간(age_band)은 배열의 view라
+    복사하지 않으며, save()한 .npz/.npy 파일은 load()로 memory-map하여 필요한 부분만 읽는다.
+    """
+
+    MALE, FEMALE = 0, 1
+
+    def __init__(self, population, start_year=2023, n_ages=None):
+        self.population = population  # (연도 × 연령 × 성별)
+        self.start_year = int(start_year)
+        self.end_year = self.start_year + population.shape[0] - 1
+        self.years = np.arange(self.start_year, self.end_year + 1)
+        if n_ages is None:  # 연도별 유효 연령 수 = 인구가 있는 마지막 연령 + 1
+            has_population = population.any(axis=2)
+            n_ages = population.shape[1] - np.argmax(has_population[:, ::-1], axis=1)
+        self.n_ages = np.asarray(n_ages, dtype=int)
+
+    @classmethod
+    def from_engine(cls, engine, scenario=0, end_year=None, dtype=None):
+        """추계엔진의 계산된 연도(end_year까지)를 최고 연령까지만 잘라 연속 배열로 복사"""
+        t = engine.last_index if end_year is None else engine.project(end_year)
+        n_ages = engine.n_ages[: t + 1]
+        population = np.ascontiguousarray(
+            engine.population[scenario, : t + 1, : n_ages.max()], dtype=dtype
+        )
+        return cls(population, engine.start_year, n_ages.copy())
+
+    def __len__(self):
+        return len(self.years)
+
+    @property
+    def nbytes(self):
+        return self.population.nbytes
+
+    def index(self, year):
+        """연도의 배열 인덱스"""
+        if not self.start_year <= year <= self.end_year:
+            raise ValueError(f"추계 범위를 벗어난 연도: {year}")
+        return year - self.start_year
+
+    def structure(self, year):
+        """해당 연도 (연령 × 성별) 인구 (view)"""
+        t = self.index(year)
+        return self.population[t, : self.n_ages[t]]
+
+    def pyramid(self, year):
+        """해당 연도 연령별 (남성, 여성) 인구 (view)"""
+        structure = self.structure(year)
+        return structure[:, self.MALE], structure[:, self.FEMALE]
+
+    def total(self, year=None):
+        """연령별 총인구 (year가 없으면 연도 × 연령 배열)"""
+        if year is None:
+            return self.population.sum(axis=-1)
+        return self.structure(year).sum(axis=-1)
+
+    def age_band(self, lo, hi=None):
+        """연령 구간 [lo, hi]의 (연도 × 연령 × 성별) 인구 (view, hi가 없으면 lo세 이상)"""
+        stop = self.population.shape[1] if hi is None else hi + 1
+        return self.population[:, lo:stop]
+
+    def cohort(self, birth_year):
+        """출생연도 코호트의 (연도, (연도 × 성별) 인구) 반환
+
+        연도와 연령이 함께 1씩 증가하는 대각선을 stride로 읽는 읽기 전용 view이다.
+        """
+        first = max(self.start_year, birth_year)
+        t = first - self.start_year
+        age = first - birth_year
+        length = min(len(self) - t, self.population.shape[1] - age)
+        if length <= 0:
+            return self.years[:0], self.population[:0, 0]
+
+        year_stride, age_stride, sex_stride = self.population.strides
+        values = np.lib.stride_tricks.as_strided(
+            self.population[t, age],
+            shape=(length, 2),
+            strides=(year_stride + age_stride, sex_stride),
+            writeable=False,
+        )
+        return self.years[t : t + length], values
+
+    def indicators(self):
+        """연도별 주요 인구지표 (CohortProjectionEngine.indicators와 같은 키)"""
+        total = self.total()
+        band_totals = INDICATOR_AGE_BUCKETS.trajectory_totals(total)
+        working_age = band_totals[..., INDICATOR_AGE_BUCKETS.band_index[WORKING_AGE]]
+        elderly = band_totals[..., INDICATOR_AGE_BUCKETS.band_index[ELDERLY]]
+
+        return {
+            "total_population": total.sum(axis=-1),
+            "working_age_population": working_age,
+            "elderly_population": elderly,
+            "elderly_dependency": elderly / working_age * 100,
+        }
+
+    def to_frame(self, year):
+        """해당 연도 인구구조를 DataFrame(age, total, male, female)으로 반환"""
+        male, female = self.pyramid(year)
+        return pd.DataFrame(
+            {
+                "age": np.arange(len(male)),
+                "total": male + female,
+                "male": male,
+                "female": female,
+            }
+        )
+
+    def save(self, path):
+        """.npz(기본, 연도 정보 포함) 또는 .npy(인구 배열만)로 비압축 저장"""
+        if path.endswith(".npy"):
+            np.save(path, self.population)
+        else:
+            np.savez(
+                path,
+                population=self.population,
+                start_year=self.start_year,
+                n_ages=self.n_ages,
+            )
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True, start_year=2023):
+        """save()한 파일 읽기 (mmap=True면 인구 배열을 읽기 전용으로 memory-map)
+
+        .npy 파일은 연도 정보가 없으므로 start_year를 지정한다.
+        """
+        mmap_mode = "r" if mmap else None
+        if path.endswith(".npy"):
+            return cls(np.load(path, mmap_mode=mmap_mode), start_year)
+
+        with np.load(path) as data:
+            start_year = int(data["start_year"])
+            n_ages = data["n_ages"]
+            population = None if mmap else data["population"]
+        if population is None:
+            population = _memmap_npz_member(path, "population")
+        return cls(population, start_year, n_ages)
+
+
+def _memmap_npz_member(path, name):
+    """비압축 .npz 안의 배열을 memory-map (압축된 경우 메모리로 읽음)"""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        with np.load(path) as data:
+            return data[name]
+
+    with open(path, "rb") as f:
+        # zip 로컬 헤더(30바이트 + 파일명 + extra) 다음에 .npy 내용이 그대로 있다
+        f.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", f.read(30)[26:])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
 def create_initial_population_2023():
     """2023년 초기 인구구조 생성
     국민연금 재정추계 자료 14페이지 참조
@@ -272,6 +591,11 @@ def create_initial_population_2023():
 
 
 def save_pop_structure(df):
+    import matplotlib.pyplot as plt
+    from figure_cache import configure_fonts
+
+    configure_fonts()
+
     # 인구구조 시각화
     plt.figure(figsize=(12, 6))
 
@@ -296,32 +620,139 @@ def save_pop_structure(df):
     plt.close()
 
 
+def _reference_population_step(demo, prev, year):
+    """기존 DataFrame 방식의 1년 코호트 요인법 (추계엔진 검증용)"""
+    prev = prev.copy()
+    prev["age"] += 1
+    survival_rates = demo._get_survival_rates(prev["age"])
+    prev["male"] *= survival_rates
+    prev["female"] *= survival_rates
+
+    fertile_women = prev[(prev["age"] >= 15) & (prev["age"] <= 49)]["female"].sum()
+    total_births = fertile_women * demo.get_fertility_rate(year) / (49 - 15 + 1)
+    newborn_row = pd.DataFrame(
+        {
+            "age": [0],
+            "total": [total_births],
+            "male": [total_births * 0.5],
+            "female": [total_births * 0.5],
+        }
+    )
+
+    migration_ratio = demo._get_net_migration(year) / prev["total"].sum()
+    prev["male"] *= 1 + migration_ratio
+    prev["female"] *= 1 + migration_ratio
+
+    structure = pd.concat([newborn_row, prev[prev["age"] <= 200]])
+    structure["total"] = structure["male"] + structure["female"]
+    return structure.reset_index(drop=True)
+
+
+def test_cohort_engine_matches_reference(rtol=1e-12):
+    """추계엔진의 연도별 인구구조가 기존 DataFrame 방식과 같은지 확인 (params 변경 포함)"""
+    demo = DemographicModule()
+    for fertility_rate in [None, {2023: 2.0, 2070: 1.5}]:
+        if fertility_rate is not None:  # 같은 모듈에서 가정 변경
+            demo.params["fertility_rate"] = fertility_rate
+        expected = demo.population_structure
+        for year in range(2024, 2094):
+            expected = _reference_population_step(demo, expected, year)
+            actual = demo.project_population(year)["population_structure"]
+            np.testing.assert_array_equal(actual["age"], expected["age"])
+            for column in ["total", "male", "female"]:
+                np.testing.assert_allclose(
+                    actual[column], expected[column], rtol=rtol, err_msg=f"{year}"
+                )
+    print("추계엔진 결과가 기존 코호트 요인법 결과와 일치합니다.")
+
+
+def test_project_scenarios():
+    """K=1 벡터화 추계가 단일 추계와 같고, 같은 seed는 같은 가정을 만드는지 확인"""
+    demo = DemographicModule()
+    single = demo.get_engine()
+    single.project(single.end_year)
+    scenarios = demo.project_scenarios([{}])
+    np.testing.assert_array_equal(scenarios["years"], single.years)
+    np.testing.assert_array_equal(scenarios["population"], single.total)
+    for key, values in single.indicators().items():
+        np.testing.assert_array_equal(scenarios["indicators"][key], values, err_msg=key)
+
+    samples = demo.sample_params(5, seed=42)
+    assert samples == demo.sample_params(5, seed=42)
+    assert samples != demo.sample_params(5, seed=43)
+    assert len({s["fertility_rate"][2023] for s in samples}) == 5
+
+    # 시나리오별 결과는 해당 가정의 단일 추계와 같음
+    scenarios = demo.project_scenarios(samples)
+    assert scenarios["population"].shape[0] == 5
+    other = DemographicModule()
+    other.params = samples[3]
+    expected = other.get_engine()
+    expected.project(expected.end_year)
+    np.testing.assert_allclose(scenarios["population"][3], expected.total[0], rtol=1e-12)
+    print("다중 시나리오 인구추계와 확률적 가정 생성이 정상 동작합니다.")
+
+
+def test_population_trajectory(tmp_dir=None):
+    """인구 궤적의 조회/저장/memory-map 읽기가 추계엔진 결과와 일치하는지 확인"""
+    import os
+    import tempfile
+
+    demo = DemographicModule()
+    trajectory = demo.project_trajectory()
+    engine = demo.get_engine()
+
+    for year in [2023, 2050, 2093]:
+        pd.testing.assert_frame_equal(trajectory.to_frame(year), engine.to_frame(year))
+    indicators = engine.indicators()
+    for key, values in trajectory.indicators().items():
+        np.testing.assert_allclose(values, indicators[key][0], rtol=1e-12, err_msg=key)
+
+    # 피라미드, 코호트는 복사 없는 view
+    male, _ = trajectory.pyramid(2050)
+    assert np.shares_memory(male, trajectory.population)
+    years, cohort = trajectory.cohort(2000)
+    assert np.shares_memory(cohort, trajectory.population)
+    assert years[0] == 2023 and years[-1] == 2093
+    np.testing.assert_array_equal(cohort[-1], trajectory.structure(2093)[93])
+
+    compact = demo.project_trajectory(dtype=np.float32)
+    assert compact.nbytes * 2 == trajectory.nbytes
+    np.testing.assert_allclose(compact.population, trajectory.population, rtol=1e-6)
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as root:
+        for name in ["trajectory.npz", "trajectory.npy"]:
+            path = trajectory.save(os.path.join(root, name))
+            loaded = PopulationTrajectory.load(path)
+            assert isinstance(loaded.population, np.memmap)
+            np.testing.assert_array_equal(loaded.population, trajectory.population)
+            np.testing.assert_array_equal(loaded.n_ages, trajectory.n_ages)
+            pd.testing.assert_frame_equal(
+                loaded.to_frame(2070), trajectory.to_frame(2070)
+            )
+            del loaded  # Windows에서 memory-map 파일 삭제 전 해제
+    print("인구 궤적 조회/저장/memory-map 읽기가 정상 동작합니다.")
+
+
 def test_demographic_module():
     demo = DemographicModule()
     demo.population_structure = create_initial_population_2023()
     # save_pop_structure(demo.population_structure)
-    results_list = []
-    for year in range(2023, 2094):
-        result = demo.project_population(year)
-        results_list.append(
-            {
-                "year": year,
-                "total_population": result["indicators"]["total_population"],
-                "working_age_population": result["indicators"][
-                    "working_age_population"
-                ],
-                "elderly_population": result["indicators"]["elderly_population"],
-                "elderly_dependency": result["indicators"]["elderly_dependency"],
-                "population_structure": result["population_structure"],
-            }
-        )
 
-    results_df = pd.DataFrame(results_list)
+    # 연도별 인구구조는 하나의 (연도 × 연령 × 성별) 배열로 보관
+    trajectory = demo.project_trajectory(2093)
+    results_df = pd.DataFrame({"year": trajectory.years, **trajectory.indicators()})
     print("\n인구추계 결과:")
     print(results_df)
+    print(
+        f"인구구조: {trajectory.population.shape} 배열 "
+        f"({trajectory.nbytes / 1e6:.1f} MB)"
+    )
 
     import matplotlib.pyplot as plt
+    from figure_cache import configure_fonts
 
+    configure_fonts()
     plt.figure(figsize=(12, 6))
     plt.plot(
         results_df["year"], results_df["total_population"] / 10000, "b-", linewidth=2
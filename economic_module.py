@@ -1,10 +1,10 @@
-import numpy as np
-import pandas as pd
+from nps_common import NPSCommon
 
 
 class EconomicModule:
-    def __init__(self):
-        """경제모듈 초기화"""
+    def __init__(self, common: NPSCommon = None):
+        """경제모듈 초기화 (물가상승률은 NPSCommon 가정을 공유)"""
+        self.common = NPSCommon() if common is None else common
         self.params = {
             "gdp_growth_rate": {  # 실질 GDP 성장률
                 2023: 0.019,
@@ -22,17 +22,6 @@ class EconomicModule:
                 2060: 0.017,
                 2070: 0.016,
             },
-            "inflation_rate": {  # 물가상승률 (보고서 p.12 참조)
-                2023: 0.022,
-                2024: 0.022,
-                2025: 0.022,
-                2026: 0.022,
-                2027: 0.022,
-                2030: 0.022,
-                2040: 0.020,
-                2050: 0.020,
-                2060: 0.020,
-            },
             "nominal_wage_growth_rate": {  # 명목임금상승률
                 2023: 0.047,  # 4.7%
                 2030: 0.044,  # 4.4%
@@ -75,83 +64,59 @@ class EconomicModule:
             "nominal_wage": nominal_wage,
         }
 
-    def _get_gdp_growth_rate(self, year):
-
-        years = sorted(self.params["gdp_growth_rate"].keys())
-        rates = [self.params["gdp_growth_rate"][y] for y in years]
+    def project_variables_path(self, years):
+        """연도 배열 전체에 대한 거시경제변수 추계 (project_variables의 배열판)"""
+        gdp = self._schedule("gdp_growth_rate")
+        wage = self._schedule("wage_growth_rate")
+        nominal_wage = self._schedule("nominal_wage_growth_rate")
 
-        if year >= years[-1]:
-            return rates[-1]
-        return np.interp(year, years, rates)
+        real_gdp = gdp.levels(years, self.base_values["nominal_gdp"])
 
-    def _get_wage_growth_rate(self, year):
+        return {
+            "year": years,
+            "gdp_growth_rate": gdp.rates(years),
+            "real_wage_growth_rate": wage.rates(years),
+            "inflation_rate": self.common.get_inflation_path(years),
+            "nominal_wage_growth_rate": nominal_wage.rates(years),
+            "real_gdp": real_gdp,
+            "nominal_gdp": real_gdp * self.common.get_cumulative_inflation_path(years),
+            "real_wage": wage.levels(years, self.base_values["nominal_wage"]),
+            "nominal_wage": nominal_wage.levels(years, self.base_values["nominal_wage"]),
+        }
 
-        years = sorted(self.params["wage_growth_rate"].keys())
-        rates = [self.params["wage_growth_rate"][y] for y in years]
+    def _get_gdp_growth_rate(self, year):
+        return self._schedule("gdp_growth_rate").rate(year)
 
-        if year >= years[-1]:
-            return rates[-1]
-        return np.interp(year, years, rates)
+    def _get_wage_growth_rate(self, year):
+        return self._schedule("wage_growth_rate").rate(year)
 
     def _get_inflation_rate(self, year):
-
-        years = sorted(self.params["inflation_rate"].keys())
-        rates = [self.params["inflation_rate"][y] for y in years]
-
-        if year >= years[-1]:
-            return rates[-1]
-        return np.interp(year, years, rates)
+        return self.common.get_inflation_rate(year)
 
     def _get_nominal_wage_growth_rate(self, year):
+        return self._schedule("nominal_wage_growth_rate").rate(year)
 
-        years = sorted(self.params["nominal_wage_growth_rate"].keys())
-        rates = [self.params["nominal_wage_growth_rate"][y] for y in years]
-
-        if year >= years[-1]:
-            return rates[-1]
-        return np.interp(year, years, rates)
+    def _schedule(self, name):
+        return self.common.schedule(name, self.params[name])
 
     def _calculate_real_gdp(self, year):
-
-        base_year = 2023
-        real_gdp = self.base_values["nominal_gdp"]
-
-        for y in range(base_year + 1, year + 1):
-            growth_rate = self._get_gdp_growth_rate(y)
-            real_gdp *= 1 + growth_rate
-
-        return real_gdp
+        return self._schedule("gdp_growth_rate").level(
+            year, self.base_values["nominal_gdp"]
+        )
 
     def _calculate_nominal_gdp(self, year):
 
         real_gdp = self._calculate_real_gdp(year)
-        base_year = 2023
-        inflation_factor = 1.0
-
-        for y in range(base_year + 1, year + 1):
-            inflation_rate = self._get_inflation_rate(y)
-            inflation_factor *= 1 + inflation_rate
+        inflation_factor = self.common.get_cumulative_inflation(2023, year)
 
         return real_gdp * inflation_factor
 
     def _calculate_real_wage(self, year):
-
-        base_year = 2023
-        real_wage = self.base_values["nominal_wage"]
-
-        for y in range(base_year + 1, year + 1):
-            growth_rate = self._get_wage_growth_rate(y)
-            real_wage *= 1 + growth_rate
-
-        return real_wage
+        return self._schedule("wage_growth_rate").level(
+            year, self.base_values["nominal_wage"]
+        )
 
     def _calculate_nominal_wage(self, year):
-
-        base_year = 2023
-        nominal_wage = self.base_values["nominal_wage"]
-
-        for y in range(base_year + 1, year + 1):
-            growth_rate = self._get_nominal_wage_growth_rate(y)
-            nominal_wage *= 1 + growth_rate
-
-        return nominal_wage
+        return self._schedule("nominal_wage_growth_rate").level(
+            year, self.base_values["nominal_wage"]
+        )
@@ -0,0 +1,375 @@
+"""그래프 렌더링 결과 캐시와 재사용 그래프 틀
+
+입력 데이터/스타일/그리기 코드의 내용 해시를 키로 인코딩된 그림(bytes)을 메모리(LRU)와
+선택적으로 디스크(cache_dir)에 저장한다. 같은 결과의 그래프는 다시 그리지 않는다.
+
+    cache = FigureCache(cache_dir="images/.cache")
+    content = cache.render(draw, df, style)        # draw(fig, data, style)
+    save_figure("images/plot.png", content)
+
+디스크 캐시는 전체 크기가 max_bytes를 넘으면 가장 오래 쓰이지 않은 그림부터 지운다
+(cache.clear()로 모두 삭제).
+"""
+
+import hashlib
+import io
+import os
+import platform
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# matplotlib은 첫 렌더링 때 불러온다 (추계만 하는 프로세스의 import 시간 절약)
+_fonts_configured = False
+
+DEFAULT_MAX_MB = 64  # 디스크 캐시 크기 한도
+
+
+def configure_fonts():
+    """한글 폰트 설정 (첫 렌더링 때 한 번만 실행)"""
+    global _fonts_configured
+    if _fonts_configured:
+        return
+
+    import matplotlib
+
+    system_name = platform.system()
+    if system_name == "Windows":
+        matplotlib.rc("font", family="Malgun Gothic")
+    elif system_name == "Darwin":  # Mac
+        matplotlib.rc("font", family="AppleGothic")
+    else:  # Linux
+        matplotlib.rc("font", family="NanumGothic")
+
+    # 마이너스 기호 깨짐 방지
+    matplotlib.rc("axes", unicode_minus=False)
+    _fonts_configured = True
+
+
+def content_hash(*parts):
+    """입력 데이터/스타일/그리기 함수의 내용 해시 (렌더링 캐시 키)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        _update_hash(digest, part)
+    return digest.hexdigest()
+
+
+def _update_hash(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr(value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=repr):
+            _update_hash(digest, key)
+            _update_hash(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update_hash(digest, item)
+        digest.update(b"]")
+    elif callable(value) and hasattr(value, "__code__"):
+        # 그리기 코드가 바뀌면 캐시도 무효화
+        _update_hash(digest, value.__qualname__)
+        _update_code_hash(digest, value.__code__)
+    else:
+        digest.update(repr(value).encode())
+
+
+def _update_code_hash(digest, code):
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _update_code_hash(digest, const)
+        else:
+            digest.update(repr(const).encode())
+    digest.update(repr(code.co_names).encode())
+
+
+def _font_style():
+    """그림 결과에 영향을 주는 전역 폰트 설정"""
+    import matplotlib
+
+    configure_fonts()
+    return {
+        "font.family": list(matplotlib.rcParams["font.family"]),
+        "axes.unicode_minus": matplotlib.rcParams["axes.unicode_minus"],
+    }
+
+
+class ChartTemplate:
+    """축/제목/라벨/범례를 한 번 만들어 두고 데이터만 바꿔 재사용하는 꺾은선 그래프 틀
+
+    panels: 축별 설정 dict 목록
+        title, xlabel, ylabel, xlim(선택), legend(선택), fontsize(선택: 제목, 라벨),
+        series: [{"label", "color", "marker"}] 꺾은선 목록
+    """
+
+    def __init__(self, panels, figsize=(10, 8), ncols=1, tight_layout=True):
+        self.spec = {
+            "panels": panels,
+            "figsize": figsize,
+            "ncols": ncols,
+            "tight_layout": tight_layout,
+        }
+        self._lock = threading.Lock()
+        self.figure = None
+
+    def _prepare(self):
+        from matplotlib.figure import Figure
+
+        panels = self.spec["panels"]
+        ncols = self.spec["ncols"]
+        self.figure = Figure(figsize=self.spec["figsize"])
+        axes = self.figure.subplots(
+            int(np.ceil(len(panels) / ncols)), ncols, squeeze=False
+        ).ravel()
+
+        self.lines = []
+        for ax, panel in zip(axes, panels):
+            title_size, label_size = panel.get("fontsize", (12, 10))
+            lines = [
+                ax.plot(
+                    [],
+                    [],
+                    marker=series.get("marker", "o"),
+                    color=series.get("color"),
+                    label=series.get("label"),
+                )[0]
+                for series in panel["series"]
+            ]
+            ax.set_title(panel.get("title", ""), fontsize=title_size)
+            ax.set_xlabel(panel.get("xlabel", ""), fontsize=label_size)
+            ax.set_ylabel(panel.get("ylabel", ""), fontsize=label_size)
+            ax.grid(True)
+            if panel.get("legend"):
+                ax.legend()
+            self.lines.append((ax, panel, lines))
+
+    def draw(self, x, panel_values):
+        """panel_values: 축별 꺾은선 y값 목록. 준비된 Figure 반환 (호출자는 lock 보유)"""
+        if self.figure is None:
+            self._prepare()
+        for (ax, panel, lines), values in zip(self.lines, panel_values):
+            for line, y in zip(lines, values):
+                line.set_data(x, y)
+            ax.relim()
+            ax.autoscale_view()
+            if panel.get("xlim"):
+                ax.set_xlim(*panel["xlim"])
+        if self.spec["tight_layout"]:
+            self.figure.tight_layout()
+        return self.figure
+
+
+class FigureCache:
+    """입력 데이터와 스타일의 내용 해시로 인코딩된 그림을 캐시
+
+    메모리(LRU, maxsize)와 선택적으로 디스크(cache_dir)에 저장하며,
+    같은 데이터/스타일/그리기 코드의 그림은 다시 그리지 않는다.
+    디스크 캐시는 max_bytes를 넘으면 가장 오래 쓰이지 않은 그림부터 삭제한다.
+    """
+
+    def __init__(self, cache_dir=None, maxsize=64, max_bytes=DEFAULT_MAX_MB * 2**20):
+        self.cache_dir = cache_dir
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+
+    def render(self, draw, data, style=None, fmt="png", **savefig_kwargs):
+        """draw(fig, data, style)로 새 Figure에 그린 결과(bytes) 반환"""
+        style = {} if style is None else style
+        key = content_hash(draw, data, style, _font_style(), fmt, savefig_kwargs)
+
+        def produce():
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=style.get("figsize", (10, 8)))
+            draw(fig, data, style)
+            return _encode(fig, fmt, savefig_kwargs)
+
+        return self._get_or_render(key, fmt, produce)
+
+    def render_template(self, template, x, panel_values, fmt="png", **savefig_kwargs):
+        """ChartTemplate에 데이터를 채워 그린 결과(bytes) 반환"""
+        key = content_hash(
+            template.spec, x, panel_values, _font_style(), fmt, savefig_kwargs
+        )
+
+        def produce():
+            with template._lock:
+                return _encode(template.draw(x, panel_values), fmt, savefig_kwargs)
+
+        return self._get_or_render(key, fmt, produce)
+
+    def _get_or_render(self, key, fmt, produce):
+        content = self._load(key, fmt)
+        if content is not None:
+            with self._lock:
+                self.hits += 1
+            return content
+
+        content = produce()
+        with self._lock:
+            self.renders += 1
+        self._store(key, fmt, content)
+        return content
+
+    def _load(self, key, fmt):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.{fmt}")
+            try:
+                with open(path, "rb") as f:
+                    content = f.read()
+                os.utime(path)  # 최근 사용 시각 갱신 (삭제 순서)
+            except FileNotFoundError:  # 없거나 다른 프로세스가 삭제
+                return None
+            self._remember(key, content)
+            return content
+        return None
+
+    def _store(self, key, fmt, content):
+        self._remember(key, content)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"{key}.{fmt}")
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self.evict()
+
+    def _remember(self, key, content):
+        with self._lock:
+            self._memory[key] = content
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def entries(self):
+        """디스크에 저장된 (최근 사용 시각, 크기, 경로) 목록 (오래된 순)"""
+        entries = []
+        if not self.cache_dir:
+            return entries
+        try:
+            scan = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return entries
+        for entry in scan:
+            if entry.name.endswith(".tmp") or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # 다른 프로세스가 삭제
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """디스크 캐시 크기가 max_bytes 이하가 될 때까지 오래된 그림 삭제, 삭제 수 반환"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+    def clear(self):
+        """메모리와 디스크에 저장된 그림 모두 삭제"""
+        with self._lock:
+            self._memory.clear()
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _encode(fig, fmt, savefig_kwargs):
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, **savefig_kwargs)
+    return buf.getvalue()
+
+
+def save_figure(path, content):
+    """인코딩된 그림을 파일로 저장 (같은 내용의 파일이 있으면 건너뜀)"""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == content:
+                return
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def test_figure_cache():
+    """같은 데이터는 다시 그리지 않고, 재사용한 틀도 새 틀과 같은 그림을 그리는지 확인"""
+    years = np.arange(2023, 2094)
+    panels = [{"title": "test", "series": [{"label": "a"}, {"label": "b"}], "legend": True}]
+    template = ChartTemplate(panels)
+    cache = FigureCache()
+
+    cache.render_template(template, years, [[years * 2.0, years * 3.0]])
+    reused = cache.render_template(template, years, [[years * 0.5, years * 0.1]])
+    assert cache.render_template(template, years, [[years * 0.5, years * 0.1]]) == reused
+    assert (cache.renders, cache.hits) == (2, 1)
+
+    fresh = FigureCache().render_template(
+        ChartTemplate(panels), years, [[years * 0.5, years * 0.1]]
+    )
+    assert fresh == reused
+    print("그림 캐시가 정상 동작합니다.")
+
+
+def test_figure_cache_disk_limit(tmp_dir=None):
+    """디스크 캐시가 크기 한도를 넘으면 가장 오래 쓰이지 않은 그림부터 삭제하는지 확인"""
+    import tempfile
+    import time
+
+    years = np.arange(2023, 2094)
+    template = ChartTemplate([{"title": "test", "series": [{"label": "a"}]}], (4, 3))
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as root:
+        cache = FigureCache(cache_dir=root, maxsize=1)  # 메모리에는 마지막 그림만
+        paths = {}
+        for scale in (1.0, 2.0, 3.0):
+            cache.render_template(template, years, [[years * scale]])
+            paths[scale] = cache.entries()[-1][2]
+            time.sleep(0.01)  # 최근 사용 시각 구분
+
+        # 디스크에서 다시 읽은 그림은 최근 사용으로 갱신
+        cache.render_template(template, years, [[years * 1.0]])
+        assert (cache.renders, cache.hits) == (3, 1)
+        cache.max_bytes = os.path.getsize(paths[1.0]) + os.path.getsize(paths[3.0])
+        assert cache.evict() == 1
+        assert not os.path.exists(paths[2.0])
+        assert os.path.exists(paths[1.0]) and os.path.exists(paths[3.0])
+
+        cache.clear()
+        assert cache.entries() == []
+    print("그림 디스크 캐시가 크기 한도를 지킵니다.")
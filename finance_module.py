@@ -1,5 +1,4 @@
 # 재정모듈
-import pandas as pd
 import numpy as np
 from nps_common import NPSCommon
 
@@ -26,6 +25,7 @@ class FinanceModule:
         }
 
         self.reserve_fund = 915e8  # 2023년 초기 명목 적립금 (915조원): 단위 만원
+        self.initial_reserve_fund = self.reserve_fund  # 전 기간 추계의 시작 적립금
         self.real_reserve_fund = 915e8  # 2023년 초기 실질 적립금 (915조원): 단위 만원
 
     def project_balance(self, year, subscribers, benefits, economic_vars):
@@ -63,6 +63,56 @@ class FinanceModule:
             "real_gdp": economic_vars["real_gdp"],
         }
 
+    def project_balance_path(
+        self,
+        years,
+        subscribers,
+        benefits,
+        economic_vars,
+        contribution_rate=None,
+        real_return=None,
+    ):
+        """전 기간 재정수지 추계 (project_balance의 배열판)
+
+        적립금 점화식만 연도 순으로 계산하고 나머지는 연도 배열로 한 번에 계산한다.
+        self.reserve_fund를 변경하지 않으며 self.initial_reserve_fund에서 시작한다.
+        contribution_rate를 (..., 1) 배열로 주면 보험료율별 결과를 한 번에 계산한다.
+        real_return을 (경로 × 연도) 배열로 주면 params의 실질투자수익률 대신 경로별로 적용한다.
+        """
+        if contribution_rate is None:
+            contribution_rate = self.params["contribution_rate"]
+        if real_return is None:
+            real_return = self._get_real_investment_return_path(years)
+        cumulative_inflation = self.common.get_cumulative_inflation_path(years)
+        path = reserve_fund_recurrence(
+            self.initial_reserve_fund,
+            subscribers["total_income_real"] * contribution_rate,
+            self._calculate_total_expenditure(years, benefits),
+            real_return,
+            cumulative_inflation,
+        )
+        path["year"] = years
+        path["nominal_gdp"] = economic_vars["nominal_gdp"]
+        path["real_gdp"] = economic_vars["real_gdp"]
+
+        return {
+            key: path[key]
+            for key in [
+                "year",
+                "nominal_revenue",
+                "real_revenue",
+                "nominal_expenditure",
+                "real_expenditure",
+                "nominal_balance",
+                "real_balance",
+                "nominal_reserve_fund",
+                "real_reserve_fund",
+                "fund_ratio",
+                "nominal_gdp",
+                "real_gdp",
+            ]
+        }
+
     def _calculate_total_revenue(self, year, subscribers, economic_vars):
         """총수입 계산 (실질가치 기준)"""
         # 1. 보험료 수입 (실질가치)
@@ -96,26 +146,21 @@ class FinanceModule:
 
     def _get_real_investment_return(self, year):
         """특정 연도의 실질투자수익률 반환"""
-        # 실질투자수익률 직접 사용
-        years = sorted(self.params["real_investment_return"].keys())
-        rates = [self.params["real_investment_return"][y] for y in years]
+        # 주어진 연도들 사이의 값은 선형보간, 이후는 마지막 값으로 유지
+        return self.common.schedule(
+            "real_investment_return", self.params["real_investment_return"]
+        ).rate(year)
 
-        # 주어진 연도들 사이의 값은 선형보간
-        # 주어진 연도 이후는 마지막 값으로 유지
-        if year >= years[-1]:
-            return rates[-1]
-        else:
-            return np.interp(year, years, rates)
+    def _get_real_investment_return_path(self, years):
+        return self.common.schedule(
+            "real_investment_return", self.params["real_investment_return"]
+        ).rates(years)
 
     def _get_nominal_investment_return(self, year):
         """특정 연도의 명목투자수익률 반환"""
-        years = sorted(self.params["nominal_investment_return"].keys())
-        rates = [self.params["nominal_investment_return"][y] for y in years]
-
-        if year >= years[-1]:
-            return rates[-1]
-        else:
-            return np.interp(year, years, rates)
+        return self.common.schedule(
+            "nominal_investment_return", self.params["nominal_investment_return"]
+        ).rate(year)
 
     def _get_inflation_rate(self, year):
         return self.common.get_inflation_rate(year)
@@ -124,6 +169,159 @@ class FinanceModule:
         return self.common.get_cumulative_inflation(base_year, target_year)
 
 
+def reserve_fund_recurrence(
+    initial_reserve,
+    contribution_revenue,
+    real_expenditure,
+    real_return,
+    cumulative_inflation,
+):
+    """적립금 점화식 (FinanceModule.project_balance와 같은 계산을 전 기간에 적용)
+
+    연도축은 마지막 축이며, 앞쪽 축(시나리오, 수익률 경로 등)은 모두 한 번에 계산된다.
+    real_return도 (..., 연도) 배열이면 경로별 수익률을 적용한다 (simulate_return_paths).
+    투자수익 = 전년도 적립금 × 실질투자수익률, 적립금 = max(0, 전년도 적립금 + 명목수지)
+    """
+    real_return = np.asarray(real_return)
+    shape = np.broadcast_shapes(
+        np.shape(contribution_revenue), np.shape(real_expenditure), real_return.shape
+    )
+    contribution_revenue = np.broadcast_to(contribution_revenue, shape)
+    real_expenditure = np.broadcast_to(real_expenditure, shape)
+    real_revenue = np.empty(shape)
+    nominal_reserve_fund = np.empty(shape)
+
+    reserve_fund = np.broadcast_to(np.asarray(initial_reserve, dtype=float), shape[:-1])
+    for t in range(shape[-1]):
+        real_revenue[..., t] = (
+            contribution_revenue[..., t] + reserve_fund * real_return[..., t]
+        )
+        real_balance = real_revenue[..., t] - real_expenditure[..., t]
+        reserve_fund = np.maximum(0, reserve_fund + real_balance * cumulative_inflation[t])
+        nominal_reserve_fund[..., t] = reserve_fund
+
+    real_balance = real_revenue - real_expenditure
+    nominal_expenditure = real_expenditure * cumulative_inflation
+    with np.errstate(divide="ignore", invalid="ignore"):  # 지출 0인 시나리오
+        fund_ratio = nominal_reserve_fund / nominal_expenditure
+
+    return {
+        "nominal_revenue": real_revenue * cumulative_inflation,
+        "real_revenue": real_revenue,
+        "nominal_expenditure": nominal_expenditure,
+        "real_expenditure": real_expenditure,
+        "nominal_balance": real_balance * cumulative_inflation,
+        "real_balance": real_balance,
+        "nominal_reserve_fund": nominal_reserve_fund,
+        "real_reserve_fund": nominal_reserve_fund / cumulative_inflation,
+        "fund_ratio": fund_ratio,
+    }
+
+
+def reserve_fund_tangent(
+    initial_reserve,
+    real_return,
+    cumulative_inflation,
+    nominal_reserve_fund,
+    d_contribution_revenue,
+    d_real_expenditure,
+    d_real_return,
+):
+    """reserve_fund_recurrence의 전진모드 미분
+
+    nominal_reserve_fund는 점화식의 결과 경로이고, d_* 는 파라미터별 (P × 연도) 방향미분이다.
+    적립금이 0으로 처리된 연도(소진 이후)의 미분은 0이다.
+    반환: (적립금 미분, 명목수지 미분) 각각 (P × 연도)
+    """
+    d_contribution_revenue, d_real_expenditure, d_real_return = np.broadcast_arrays(
+        d_contribution_revenue, d_real_expenditure, d_real_return
+    )
+    shape = d_contribution_revenue.shape
+    d_reserve_fund = np.empty(shape)
+    d_nominal_balance = np.empty(shape)
+
+    prev_reserve = initial_reserve
+    d_prev_reserve = np.zeros(shape[:-1])
+    for t in range(shape[-1]):
+        d_real_balance = (
+            d_contribution_revenue[..., t]
+            + d_prev_reserve * real_return[t]
+            + prev_reserve * d_real_return[..., t]
+            - d_real_expenditure[..., t]
+        )
+        d_nominal_balance[..., t] = d_real_balance * cumulative_inflation[t]
+
+        reserve_fund = nominal_reserve_fund[..., t]
+        d_prev_reserve = np.where(
+            reserve_fund > 0, d_prev_reserve + d_nominal_balance[..., t], 0.0
+        )
+        d_reserve_fund[..., t] = d_prev_reserve
+        prev_reserve = reserve_fund
+
+    return d_reserve_fund, d_nominal_balance
+
+
+# 확률적 실질투자수익률 모형별 기본 모수
+RETURN_MODELS = {
+    # 연도별 독립 정규분포: r = 평균 + sigma * e
+    "normal": {"sigma": 0.05},
+    # AR(1) 편차: x_t = phi * x_(t-1) + sigma * sqrt(1 - phi^2) * e (정상분포 표준편차 sigma)
+    "ar1": {"sigma": 0.05, "phi": 0.3},
+    # 2국면(평시/위기) 마르코프 전환: r = 평균 + offset[s] + sigma[s] * e
+    # 유지확률 0.9/0.6이면 위기 비중 20%, offset은 장기 평균 편차가 0이 되도록 설정
+    "regime": {
+        "stay": (0.9, 0.6),
+        "offset": (0.005, -0.02),
+        "sigma": (0.04, 0.10),
+    },
+}
+
+
+def simulate_return_paths(mean_returns, n_paths, model="normal", rng=None, **params):
+    """연도별 평균 실질투자수익률(mean_returns) 주변의 (경로 × 연도) 수익률 경로 생성
+
+    model: RETURN_MODELS의 키 ("normal", "ar1", "regime"), params로 기본 모수 변경.
+    rng는 np.random.Generator 또는 seed이며, 연도 순 반복 외에는 경로 축으로 벡터화한다.
+    """
+    if model not in RETURN_MODELS:
+        raise ValueError(f"지원하지 않는 수익률 모형: {model}")
+    unknown = set(params) - set(RETURN_MODELS[model])
+    if unknown:
+        raise ValueError(f"{model} 모형에 없는 모수: {sorted(unknown)}")
+    params = {**RETURN_MODELS[model], **params}
+    rng = np.random.default_rng(rng)
+
+    mean_returns = np.asarray(mean_returns, dtype=float)
+    shocks = rng.standard_normal((n_paths, len(mean_returns)))
+
+    if model == "normal":
+        return mean_returns + params["sigma"] * shocks
+
+    if model == "ar1":
+        phi, sigma = params["phi"], params["sigma"]
+        deviation = np.empty_like(shocks)
+        deviation[:, 0] = sigma * shocks[:, 0]  # 정상분포에서 시작
+        innovation = sigma * np.sqrt(1 - phi**2) * shocks
+        for t in range(1, shocks.shape[1]):
+            deviation[:, t] = phi * deviation[:, t - 1] + innovation[:, t]
+        return mean_returns + deviation
+
+    # regime: 0 평시, 1 위기. 첫 해 국면은 정상분포(장기 비중)에서 추출
+    stay = np.asarray(params["stay"], dtype=float)
+    offset = np.asarray(params["offset"], dtype=float)
+    sigma = np.asarray(params["sigma"], dtype=float)
+    crisis_share = (1 - stay[0]) / (2 - stay[0] - stay[1])
+    uniforms = rng.random(shocks.shape)
+
+    regime = np.empty(shocks.shape, dtype=np.intp)
+    regime[:, 0] = uniforms[:, 0] < crisis_share
+    for t in range(1, shocks.shape[1]):
+        regime[:, t] = np.where(
+            uniforms[:, t] < stay[regime[:, t - 1]], regime[:, t - 1], 1 - regime[:, t - 1]
+        )
+    return mean_returns + offset[regime] + sigma[regime] * shocks
+
+
 class SubscriberModule:
     def __init__(self, common: NPSCommon):
         self.common = common
@@ -149,22 +347,17 @@ class SubscriberModule:
         subscribers = {}
         total_income_real = 0
 
-        # 물가상승률은 한 번만 계산
-        cumulative_inflation = 1.0
-        base_year = 2023
-        for y in range(base_year + 1, year + 1):
-            inflation_rate = self._get_inflation_rate(y)
-            cumulative_inflation *= 1 + inflation_rate
+        # 누적 물가상승률 (공통 스케줄에서 조회)
+        cumulative_inflation = self.common.get_cumulative_inflation(2023, year)
 
-        for age_group, rate in self.params["participation_rate"].items():
-            # 해당 연령대 인구
-            age_pop = population_structure[
-                (population_structure["age"] >= age_group[0])
-                & (population_structure["age"] <= age_group[1])
-            ]["total"].sum()
+        # 연령대별 인구 (공통 연령대 인덱스로 일괄 집계)
+        age_pops = self.common.age_band_totals(
+            population_structure, self.params["participation_rate"]
+        )
 
+        for age_group, rate in self.params["participation_rate"].items():
             # 연령대 가입자 수
-            subscribers[age_group] = age_pop * rate
+            subscribers[age_group] = age_pops[age_group] * rate
 
             # 실질 소득 계산 (2023년 기준 실질가치)
             avg_income = self.params["avg_income"][age_group]
@@ -181,6 +374,32 @@ class SubscriberModule:
             "total_income_real": total_income_real,
         }
 
+    def project_subscribers_path(self, years, population):
+        """전 기간 가입자 추계 (project_subscribers의 배열판)
+
+        population은 (연도 × 연령) 총인구 배열 (0세부터 정렬)
+        """
+        age_pops = self.common.age_band_trajectory(
+            population, self.params["participation_rate"]
+        )
+
+        subscribers = {}
+        total_income_real = 0
+        for age_group, rate in self.params["participation_rate"].items():
+            subscribers[age_group] = age_pops[age_group] * rate
+            avg_income = self.params["avg_income"][age_group]
+            total_income_real += subscribers[age_group] * avg_income * 12
+
+        cumulative_inflation = self.common.get_cumulative_inflation_path(years)
+
+        return {
+            "year": years,
+            "subscribers": subscribers,
+            "total_subscribers": sum(subscribers.values()),
+            "total_income_nominal": total_income_real * cumulative_inflation,
+            "total_income_real": total_income_real,
+        }
+
 
 class BenefitModule:
     def __init__(self, common: NPSCommon):
@@ -210,29 +429,56 @@ class BenefitModule:
         return self.common.get_cumulative_inflation(base_year, target_year)
 
     def _get_benefit_rate(self, year):
-
-        years = sorted(self.params["benefit_rate"].keys())
-        rates = [self.params["benefit_rate"][y] for y in years]
-
-        if year >= years[-1]:
-            return rates[-1]
-        return np.interp(year, years, rates)
+        return self._schedule("benefit_rate").rate(year)
 
     def _get_avg_insured_period(self, year):
+        return self._schedule("avg_insured_period").rate(year)
+
+    def _schedule(self, name):
+        return self.common.schedule(name, self.params[name])
+
+    def project_benefits_path(
+        self, years, population, subscribers_data, income_replacement=None
+    ):
+        """전 기간 급여지출 추계 (project_benefits의 배열판)
+
+        population은 (연도 × 연령) 총인구 배열 (0세부터 정렬)
+        income_replacement를 (..., 1) 배열로 주면 소득대체율별 결과를 한 번에 계산한다.
+        """
+        if income_replacement is None:
+            income_replacement = self.params["income_replacement"]
+        elderly_pop = self.common.age_band_trajectory(population, [(65, None)])[
+            (65, None)
+        ]
+        beneficiaries = elderly_pop * self._schedule("benefit_rate").rates(years)
+
+        avg_insured_period = self._schedule("avg_insured_period").rates(years)
+        avg_income_real = (
+            subscribers_data["total_income_real"]
+            / subscribers_data["total_subscribers"]
+        )
+        avg_benefit_real = (
+            avg_income_real * income_replacement * (avg_insured_period / 40)
+        )
+        total_benefits_real = beneficiaries * avg_benefit_real
 
-        years = sorted(self.params["avg_insured_period"].keys())
-        periods = [self.params["avg_insured_period"][y] for y in years]
+        cumulative_inflation = self.common.get_cumulative_inflation_path(years)
 
-        if year >= years[-1]:
-            return periods[-1]
-        return np.interp(year, years, periods)
+        return {
+            "year": years,
+            "beneficiaries": beneficiaries,
+            "avg_benefit_nominal": avg_benefit_real * cumulative_inflation,
+            "avg_benefit_real": avg_benefit_real,
+            "total_benefits_nominal": total_benefits_real * cumulative_inflation,
+            "total_benefits_real": total_benefits_real,
+        }
 
     def project_benefits(self, year, population_structure, subscribers_data):
 
         # 수급자 수 추계
-        elderly_pop = population_structure[population_structure["age"] >= 65][
-            "total"
-        ].sum()
+        elderly_pop = self.common.age_band_totals(population_structure, [(65, None)])[
+            (65, None)
+        ]
         benefit_rate = self._get_benefit_rate(year)
         beneficiaries = elderly_pop * benefit_rate
 
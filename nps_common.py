@@ -1,6 +1,153 @@
 import numpy as np
 
 
+class AgeBucketIndex:
+    """연령대별 합계를 위한 사전계산 인덱스
+
+    모든 연령대 경계로 연령을 서로 겹치지 않는 기본구간으로 나누고(연령별 bucket id),
+    기본구간 합계에 (기본구간 × 연령대) 행렬을 곱해 겹치는 연령대 합계를 구한다.
+    연령대는 (하한, 상한) 튜플이며 상한 포함, 상한이 None이면 하한 이상 전체.
+    """
+
+    def __init__(self, bands, max_age=200):
+        self.bands = list(dict.fromkeys(bands))
+        self.band_index = {band: j for j, band in enumerate(self.bands)}
+        self.max_age = max_age
+
+        edges = {0}
+        for lo, hi in self.bands:
+            edges.add(lo)
+            if hi is not None:
+                edges.add(hi + 1)
+        edges = np.array(sorted(e for e in edges if e <= max_age))
+
+        ages = np.arange(max_age + 1)
+        self.bucket_id = np.searchsorted(edges, ages, side="right") - 1
+        self.n_buckets = len(edges)
+
+        self.band_matrix = np.zeros((self.n_buckets, len(self.bands)))
+        for j, (lo, hi) in enumerate(self.bands):
+            upper = max_age if hi is None else min(hi, max_age)
+            self.band_matrix[np.unique(self.bucket_id[lo : upper + 1]), j] = 1.0
+        # 연령별 연령대 소속 행렬 (연령 × 연령대)
+        self.age_matrix = self.band_matrix[self.bucket_id]
+
+    def totals(self, ages, values):
+        """한 연도의 연령별 값(values)을 연령대별 합계 dict로 반환 (bincount 1회)"""
+        bucket_totals = np.bincount(
+            self.bucket_id[ages], weights=values, minlength=self.n_buckets
+        )
+        return dict(zip(self.bands, bucket_totals @ self.band_matrix))
+
+    def trajectory_totals(self, values):
+        """(..., 연령) 배열(0세부터 정렬)을 (..., 연령대) 합계로 변환 (행렬곱 1회)"""
+        return values @ self.age_matrix[: values.shape[-1]]
+
+
+class AssumptionSchedule:
+    """연도별 가정값(dict)을 연도별 배열로 한 번만 컴파일한 스케줄
+
+    기준연도부터 연도별 값(선형보간, 구간 밖은 양 끝값 유지)과
+    누적지수 prod(1 + 값)를 미리 계산하여 값/누적지수 조회를 배열 읽기로 처리한다.
+    """
+
+    def __init__(self, table, start_year=2023, end_year=2093):
+        self.table = dict(table)
+        self.start_year = start_year
+        self._compile(end_year)
+
+    def _compile(self, end_year):
+        keys = sorted(self.table.keys())
+        values = [self.table[y] for y in keys]
+
+        self.end_year = end_year
+        self.years = np.arange(self.start_year, end_year + 1)
+        self.values = np.interp(self.years, keys, values)
+
+        # 기준연도 대비 누적지수 (기준연도 = 1)
+        growth = 1 + self.values
+        growth[0] = 1.0
+        self.growth = growth
+        self.cumulative_factors = np.cumprod(growth)
+        self._levels = {}
+
+    def _index(self, year):
+        """연도의 배열 인덱스 (기준연도 이전 연도는 기준연도 인덱스 0)"""
+        if year > self.end_year:
+            self._compile(year)
+        return max(year - self.start_year, 0)
+
+    def _indices(self, years):
+        years = np.asarray(years)
+        self._index(int(years.max()))
+        return np.maximum(years - self.start_year, 0)
+
+    def _interp(self, years):
+        keys = sorted(self.table.keys())
+        return np.interp(years, keys, [self.table[y] for y in keys])
+
+    def rates(self, years):
+        """연도 배열에 대한 값 배열 (기준연도 이전은 rate와 같이 보간)"""
+        t = self._indices(years)
+        before = np.asarray(years) < self.start_year
+        if before.any():
+            return np.where(before, self._interp(years), self.values[t])
+        return self.values[t]
+
+    def cumulative_path(self, years):
+        """연도 배열에 대한 기준연도 대비 누적지수 배열 (기준연도 이전은 1)"""
+        t = self._indices(years)
+        return self.cumulative_factors[t]
+
+    def levels(self, years, base_value):
+        """연도 배열에 대한 수준값 배열 (기준연도 이전은 base_value)"""
+        t = self._indices(years)
+        self.level(self.start_year, base_value)
+        return self._levels[base_value][t]
+
+    def point_weights(self, years):
+        """가정 연도(key)별 값이 연도 배열의 값에 미치는 선형보간 가중치
+
+        반환: (가정 연도 목록, (가정 연도 수 × 연도) 가중치 배열) — 값에 대한 미분과 같다.
+        """
+        keys = sorted(self.table.keys())
+        basis = np.eye(len(keys))
+        return keys, np.array([np.interp(years, keys, row) for row in basis])
+
+    def rate(self, year):
+        """특정 연도의 값"""
+        if year < self.start_year:
+            return self._interp(year)
+        t = self._index(year)  # 종료연도 이후면 다시 컴파일하므로 먼저 계산
+        return self.values[t]
+
+    def cumulative(self, base_year, target_year):
+        """base_year 다음 해부터 target_year까지의 누적지수 prod(1 + 값)"""
+        if target_year <= base_year:
+            return 1.0
+        if base_year < self.start_year:
+            cumulative = 1.0
+            for year in range(base_year + 1, target_year + 1):
+                cumulative *= 1 + self.rate(year)
+            return cumulative
+        t = self._index(target_year)
+        if base_year == self.start_year:
+            return self.cumulative_factors[t]
+        return self.cumulative_factors[t] / self.cumulative_factors[
+            self._index(base_year)
+        ]
+
+    def level(self, year, base_value):
+        """기준연도 값 base_value에 누적지수를 적용한 year의 수준값 (기준연도 이전은 base_value)"""
+        t = self._index(year)
+        levels = self._levels.get(base_value)
+        if levels is None:
+            growth = self.growth.copy()
+            growth[0] = base_value
+            levels = self._levels[base_value] = np.cumprod(growth)
+        return levels[t]
+
+
 class NPSCommon:
     def __init__(self):
 
@@ -18,19 +165,133 @@ class NPSCommon:
             }
         }
 
+        # 모듈 공통 연령대 인덱스 (가입자/수급자 모듈이 연령대를 추가 등록)
+        self.age_buckets = AgeBucketIndex([(18, 64), (65, None)])
+        self._band_totals_cache = (None, None)
+        self._schedules = {}  # 이름별 컴파일된 가정 스케줄
+
+    def schedule(self, name, table):
+        """가정 dict를 컴파일한 AssumptionSchedule 반환 (dict 내용이 바뀌면 재컴파일)"""
+        compiled = self._schedules.get(name)
+        if compiled is None or compiled.table != table:
+            compiled = self._schedules[name] = AssumptionSchedule(table)
+        return compiled
+
+    def age_band_totals(self, population_structure, bands):
+        """인구구조의 연령대별 총인구 합계 dict 반환
+
+        같은 인구구조 객체에 대한 반복 호출(가입자/급여 모듈)은 한 번의 집계를 공유한다.
+        인구구조를 제자리에서 수정한 경우에는 새 객체로 전달해야 한다.
+        """
+        self._register_age_bands(bands)
+
+        cached_structure, totals = self._band_totals_cache
+        if cached_structure is not population_structure:
+            totals = self.age_buckets.totals(
+                population_structure["age"].to_numpy(),
+                population_structure["total"].to_numpy(),
+            )
+            self._band_totals_cache = (population_structure, totals)
+
+        return {band: totals[band] for band in bands}
+
+    def age_band_trajectory(self, population, bands):
+        """(연도 × 연령) 총인구 배열의 연령대별 합계 dict (연령대별 연도 배열) 반환"""
+        self._register_age_bands(bands)
+        totals = self.age_buckets.trajectory_totals(population)
+        index = self.age_buckets.band_index
+        return {band: totals[..., index[band]] for band in bands}
+
+    def _register_age_bands(self, bands):
+        missing = [band for band in bands if band not in self.age_buckets.band_index]
+        if missing:
+            self.age_buckets = AgeBucketIndex(self.age_buckets.bands + missing)
+            self._band_totals_cache = (None, None)
+
     def get_inflation_rate(self, year):
         # 실질 물가 상승률률
-        years = sorted(self.common_params["inflation_rate"].keys())
-        rates = [self.common_params["inflation_rate"][y] for y in years]
+        return self.schedule(
+            "inflation_rate", self.common_params["inflation_rate"]
+        ).rate(year)
+
+    def get_inflation_path(self, years):
+        return self.schedule(
+            "inflation_rate", self.common_params["inflation_rate"]
+        ).rates(years)
 
-        if year >= years[-1]:
-            return rates[-1]
-        return np.interp(year, years, rates)
+    def get_cumulative_inflation_path(self, years):
+        """연도 배열에 대한 2023년 대비 누적 물가지수 배열"""
+        return self.schedule(
+            "inflation_rate", self.common_params["inflation_rate"]
+        ).cumulative_path(years)
 
     def get_cumulative_inflation(self, base_year, target_year):
+        return self.schedule(
+            "inflation_rate", self.common_params["inflation_rate"]
+        ).cumulative(base_year, target_year)
+
+
+def test_age_bucket_index():
+    """겹치는 연령대 합계가 연령 마스크로 직접 더한 값과 같은지 확인"""
+    bands = [(18, 64), (65, None), (18, 59), (60, 64), (0, 17), (100, None), (65, 250)]
+    index = AgeBucketIndex(bands + [(18, 64)])  # 중복 연령대는 한 번만 등록
+    assert index.bands == bands
+
+    rng = np.random.default_rng(0)
+    ages = np.arange(120)
+    values = rng.uniform(0, 1000, len(ages))
+    totals = index.totals(ages, values)
+    trajectory = index.trajectory_totals(np.stack([values, 2 * values]))
+    for lo, hi in bands:
+        mask = (ages >= lo) & (ages <= (index.max_age if hi is None else hi))
+        expected = values[mask].sum()
+        assert np.isclose(totals[(lo, hi)], expected), (lo, hi)
+        j = index.band_index[(lo, hi)]
+        np.testing.assert_allclose(trajectory[:, j], [expected, 2 * expected])
+
+    # 일부 연령만 있어도 (정렬되지 않은 연령) 같은 결과
+    order = rng.permutation(len(ages))[:60]
+    partial = index.totals(ages[order], values[order])
+    for lo, hi in bands:
+        selected = ages[order]
+        mask = (selected >= lo) & (selected <= (index.max_age if hi is None else hi))
+        assert np.isclose(partial[(lo, hi)], values[order][mask].sum()), (lo, hi)
+    print("연령대 인덱스 합계가 직접 계산한 값과 일치합니다.")
 
-        cumulative = 1.0
+
+def test_assumption_schedule():
+    """컴파일한 스케줄이 연도별 보간/누적 계산과 같은지 확인 (기준연도 이전, 종료연도 이후 포함)"""
+    table = {2020: 0.01, 2023: 0.03, 2030: 0.02, 2050: 0.015}
+    keys = sorted(table)
+
+    def rate(year):
+        return np.interp(year, keys, [table[y] for y in keys])
+
+    def cumulative(base_year, target_year):
+        result = 1.0
         for year in range(base_year + 1, target_year + 1):
-            inflation_rate = self.get_inflation_rate(year)
-            cumulative *= 1 + inflation_rate
-        return cumulative
+            result *= 1 + rate(year)
+        return result
+
+    schedule = AssumptionSchedule(table, start_year=2023, end_year=2093)
+    years = np.arange(2015, 2101)  # 2100까지 조회하면 다시 컴파일
+    base_value = 100.0
+    for year in years:
+        assert np.isclose(schedule.rate(year), rate(year)), year
+        expected_level = base_value * cumulative(2023, year)  # 기준연도 이전은 base_value
+        assert np.isclose(schedule.level(year, base_value), expected_level), year
+        for base_year in (2018, 2023, 2040):
+            assert np.isclose(
+                schedule.cumulative(base_year, year), cumulative(base_year, year)
+            ), (base_year, year)
+
+    assert schedule.end_year == 2100
+    np.testing.assert_allclose(schedule.rates(years), [rate(y) for y in years])
+    np.testing.assert_allclose(
+        schedule.cumulative_path(years), [cumulative(2023, y) for y in years]
+    )
+    np.testing.assert_allclose(
+        schedule.levels(years, base_value),
+        [base_value * cumulative(2023, y) for y in years],
+    )
+    print("가정 스케줄이 연도별 계산과 일치합니다.")
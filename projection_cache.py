@@ -0,0 +1,273 @@
+"""재정추계 결과의 디스크 캐시
+
+가정 전체와 정책변수의 fingerprint(NationalPensionModel.fingerprint)와 추계 코드의
+해시를 키로 결과를 .npz 파일에 저장한다. 같은 가정으로 다시 실행하면 (다른 프로세스,
+노트북, 웹 앱 워커라도) 계산하지 않고 저장된 결과를 읽는다.
+
+    cache = ProjectionCache()
+    rs = cache.run(model)                  # model.run_projection()과 같은 형식
+    rs = cache.run(model, columnar=True)   # model.run_projection_columnar()와 같은 형식
+
+디렉터리 전체 크기가 max_bytes를 넘으면 가장 오래 쓰이지 않은 결과부터 지운다.
+환경변수: NPS_PROJECTION_CACHE_DIR(저장 위치), NPS_PROJECTION_CACHE_MB(크기 한도, 0이면 끔)
+"""
+
+import hashlib
+import os
+import threading
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "projections")
+DEFAULT_MAX_MB = 256
+
+RESULT_KEYS = ("financial_results", "demographic_results")
+
+# 추계 결과를 결정하는 코드 (바뀌면 이전 결과를 쓰지 않음)
+MODEL_SOURCES = (
+    "NPS_model.py",
+    "nps_common.py",
+    "demographic_module.py",
+    "economic_module.py",
+    "finance_module.py",
+)
+
+_code_version = None
+
+
+def code_version():
+    """추계 코드(MODEL_SOURCES) 내용의 해시 (프로세스당 한 번 계산)"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for name in MODEL_SOURCES:
+            with open(os.path.join(BASE_DIR, name), "rb") as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+class ProjectionCache:
+    """fingerprint -> 추계 결과(.npz) 디스크 캐시 (크기 제한, 최근 사용 순 삭제)
+
+    여러 프로세스가 같은 디렉터리를 함께 써도 되며, 파일은 임시 파일에 쓴 뒤
+    교체하므로 쓰다 만 결과를 읽지 않는다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_MB * 2**20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """환경변수(NPS_PROJECTION_CACHE_DIR, NPS_PROJECTION_CACHE_MB) 설정으로 생성"""
+        return cls(
+            cache_dir=os.environ.get("NPS_PROJECTION_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_bytes=int(
+                float(os.environ.get("NPS_PROJECTION_CACHE_MB", DEFAULT_MAX_MB)) * 2**20
+            ),
+        )
+
+    @property
+    def enabled(self):
+        return bool(self.cache_dir) and self.max_bytes > 0
+
+    def key(self, model, columnar=False):
+        """모델 가정/정책변수, 추계 방식, 코드 버전의 해시"""
+        kind = "columnar" if columnar else "yearly"
+        parts = [model.fingerprint(), kind, code_version()]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def run(self, model, columnar=False):
+        """저장된 결과가 있으면 읽고, 없으면 추계 후 저장
+
+        저장된 결과를 쓰면 model은 추계하지 않으므로 적립금 등 상태가 바뀌지 않는다.
+        """
+        if not self.enabled:
+            return _project(model, columnar)
+
+        key = self.key(model, columnar)
+        frames = self.get(key)
+        if frames is not None:
+            return _from_frames(frames, columnar)
+
+        results = _project(model, columnar)
+        self.put(key, {name: pd.DataFrame(results[name]) for name in RESULT_KEYS})
+        return results
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        """저장된 결과({이름: DataFrame}) 반환 (없으면 None)"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                frames = _unpack(data)
+            os.utime(path)  # 최근 사용 시각 갱신 (삭제 순서)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):  # 없거나 손상된 파일
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return frames
+
+    def put(self, key, frames):
+        """결과({이름: DataFrame}) 저장 후 크기 한도를 넘으면 오래된 결과 삭제"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        arrays = {
+            f"{name}/{column}": frame[column].to_numpy()
+            for name, frame in frames.items()
+            for column in frame.columns
+        }
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """저장된 (최근 사용 시각, 크기, 경로) 목록 (오래된 순)"""
+        entries = []
+        try:
+            scan = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return entries
+        for entry in scan:
+            if not entry.name.endswith(".npz"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # 다른 프로세스가 삭제
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래된 결과 삭제, 삭제 수 반환"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _project(model, columnar):
+    if columnar:
+        return model.run_projection_columnar()
+    # 연도별 추계는 현재 적립금에서 시작하므로 키(initial_reserve_fund)와 맞춘다
+    model.finance.reserve_fund = model.finance.initial_reserve_fund
+    return model.run_projection()
+
+
+def _unpack(data):
+    columns = {name: {} for name in RESULT_KEYS}
+    for member in data.files:  # 저장한 열 순서 유지
+        name, column = member.split("/", 1)
+        columns[name][column] = data[member]
+    return {name: pd.DataFrame(values) for name, values in columns.items()}
+
+
+def _from_frames(frames, columnar):
+    """저장된 DataFrame을 run_projection(연도별 dict list) 또는 columnar 형식으로 변환"""
+    if columnar:
+        return dict(frames)
+    return {name: frame.to_dict("records") for name, frame in frames.items()}
+
+
+def test_projection_cache(tmp_dir=None):
+    """저장된 결과가 새로 계산한 결과와 같고, 가정이 바뀌면 새로 계산하며, 크기 한도를 지키는지 확인"""
+    import tempfile
+
+    from NPS_model import NationalPensionModel
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as root:
+        cache = ProjectionCache(root)
+        for columnar in (False, True):
+            model = NationalPensionModel()
+            expected = _project(NationalPensionModel(), columnar)
+            computed = cache.run(model, columnar)
+            cached = cache.run(NationalPensionModel(), columnar)
+            for name in RESULT_KEYS:
+                pd.testing.assert_frame_equal(
+                    pd.DataFrame(cached[name]), pd.DataFrame(expected[name])
+                )
+                pd.testing.assert_frame_equal(
+                    pd.DataFrame(computed[name]), pd.DataFrame(expected[name])
+                )
+            if not columnar:
+                assert isinstance(cached["financial_results"], list)
+        assert (cache.hits, cache.misses) == (2, 2), cache.stats()
+
+        # 정책변수/가정이 바뀌면 다른 키
+        model = NationalPensionModel()
+        keys = {cache.key(model)}
+        model.finance.params["contribution_rate"] = 0.12
+        keys.add(cache.key(model))
+        model.demographic.params["fertility_rate"][2030] = 1.0
+        keys.add(cache.key(model))
+        model.finance.params["contribution_rate"] = 0.12 * 100 / 100
+        assert cache.key(model) in keys and len(keys) == 3
+
+        # 크기 한도: 가장 오래 쓰이지 않은 결과부터 삭제
+        entry_size = cache.size() // 2
+        cache.max_bytes = entry_size * 2
+        oldest = cache.entries()[0][2]
+        cache.run(model)
+        assert len(cache.entries()) == 2 and not os.path.exists(oldest)
+
+        # 이미 추계한 모델에서 가정을 바꿔도 저장된 결과가 새 모델의 결과와 같음
+        for columnar in (False, True):
+            model = NationalPensionModel()
+            model.run_projection()  # 적립금(reserve_fund)이 추계 마지막 해 값으로 바뀜
+            model.finance.params["contribution_rate"] = 0.13
+            model.demographic.params["fertility_rate"] = {2023: 2.0, 2070: 2.0}
+            fresh = NationalPensionModel()
+            fresh.finance.params["contribution_rate"] = 0.13
+            fresh.demographic.params["fertility_rate"] = {2023: 2.0, 2070: 2.0}
+            expected = _project(fresh, columnar)
+            computed = cache.run(model, columnar)
+            stored = cache.get(cache.key(model, columnar))
+            for name in RESULT_KEYS:
+                expected_frame = pd.DataFrame(expected[name])
+                pd.testing.assert_frame_equal(
+                    pd.DataFrame(computed[name]), expected_frame
+                )
+                pd.testing.assert_frame_equal(stored[name], expected_frame)
+    print("추계 결과 캐시가 정상 동작합니다.")
@@ -0,0 +1,282 @@
+"""재정추계/시뮬레이션 결과의 열 단위 저장 (Parquet, Arrow IPC)
+
+pyarrow가 있어야 한다 (pip install pyarrow). 없으면 CSV 저장을 사용한다.
+
+    writer = ResultsWriter("results/20250202_220713")
+    writer.write_projection(rs, contribution_rate=9.0, income_replacement=40.0)
+    writer.append_simulation(rows)  # 시나리오가 끝날 때마다 추가
+    table = read_results("results/20250202_220713", "financial", contribution_rate=9.0)
+    df = table.to_pandas()
+
+디렉터리 구조 (hive 분할, 파티션 열 값은 파일 안에 저장하지 않음):
+    <root>/financial/contribution_rate=9.0/income_replacement=40.0/part-00000.parquet
+    <root>/demographic/contribution_rate=9.0/income_replacement=40.0/part-00000.parquet
+    <root>/simulation/contribution_rate=9.0/part-00000.parquet
+
+보험료율/소득대체율은 퍼센트 단위이며 부동소수 오차(7.000000000000001)를 반올림해 저장한다.
+Arrow IPC(fmt="arrow")는 기본적으로 압축하지 않아 읽을 때 memory-map으로 복사 없이 연다.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+PARQUET = "parquet"
+ARROW = "arrow"
+
+RATE_COLUMNS = ("contribution_rate", "income_replacement")
+RATE_DIGITS = 10  # 퍼센트 값 반올림 자릿수
+
+# 표 이름: (열 이름, 자료형) 목록
+SCHEMAS = {
+    "financial": [
+        ("contribution_rate", "float64"),
+        ("income_replacement", "float64"),
+        ("year", "int16"),
+        ("nominal_revenue", "float64"),
+        ("real_revenue", "float64"),
+        ("nominal_expenditure", "float64"),
+        ("real_expenditure", "float64"),
+        ("nominal_balance", "float64"),
+        ("real_balance", "float64"),
+        ("nominal_reserve_fund", "float64"),
+        ("real_reserve_fund", "float64"),
+        ("fund_ratio", "float64"),
+        ("nominal_gdp", "float64"),
+        ("real_gdp", "float64"),
+    ],
+    "demographic": [
+        ("contribution_rate", "float64"),
+        ("income_replacement", "float64"),
+        ("year", "int16"),
+        ("total_population", "float64"),
+        ("working_age_population", "float64"),
+        ("elderly_population", "float64"),
+        ("elderly_dependency", "float64"),
+        ("total_subscribers", "float64"),
+        ("total_income_nominal", "float64"),
+        ("total_income_real", "float64"),
+    ],
+    "simulation": [
+        ("contribution_rate", "float64"),
+        ("income_replacement", "float64"),
+        ("max_reserve", "float64"),
+        ("max_reserve_year", "int16"),
+        ("first_deficit_year", "int16"),  # 적자/소진이 없으면 null
+        ("depletion_year", "int16"),
+    ],
+}
+
+# 표 이름: 분할(디렉터리) 열
+PARTITIONS = {
+    "financial": ("contribution_rate", "income_replacement"),
+    "demographic": ("contribution_rate", "income_replacement"),
+    "simulation": ("contribution_rate",),
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "열 단위 결과 저장에는 pyarrow가 필요합니다 (pip install pyarrow)."
+        ) from e
+    return pyarrow
+
+
+def has_pyarrow():
+    """pyarrow 설치 여부 (없으면 CSV 저장 사용)"""
+    try:
+        _require_pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def schema(name):
+    """표의 pyarrow 스키마 (파티션 열 포함)"""
+    pa = _require_pyarrow()
+    return pa.schema([(column, getattr(pa, dtype)()) for column, dtype in SCHEMAS[name]])
+
+
+def _partitioning(name):
+    import pyarrow.dataset as ds
+
+    full = schema(name)
+    return ds.partitioning(
+        _require_pyarrow().schema([full.field(c) for c in PARTITIONS[name]]),
+        flavor="hive",
+    )
+
+
+def _round_rate(value):
+    return round(float(value), RATE_DIGITS)
+
+
+class ResultsWriter:
+    """결과 표를 시나리오별 파티션 파일로 추가 저장
+
+    fmt: "parquet" 또는 "arrow" (Arrow IPC 파일)
+    compression: parquet 기본 "zstd", arrow 기본 None (memory-map 무복사 읽기)
+    한 디렉터리에는 한 프로세스의 writer만 쓴다고 가정한다 (파일 번호 충돌 방지).
+    """
+
+    def __init__(self, root, fmt=PARQUET, compression="default"):
+        if fmt not in (PARQUET, ARROW):
+            raise ValueError(f"지원하지 않는 형식: {fmt}")
+        _require_pyarrow()
+        self.root = root
+        self.fmt = fmt
+        if compression == "default":
+            compression = "zstd" if fmt == PARQUET else None
+        self.compression = compression
+
+    def write_projection(self, rs, contribution_rate, income_replacement):
+        """run_projection(_columnar) 결과를 시나리오(보험료율, 소득대체율 %) 파티션에 저장"""
+        scenario = {
+            "contribution_rate": contribution_rate,
+            "income_replacement": income_replacement,
+        }
+        paths = []
+        for name, key in [
+            ("financial", "financial_results"),
+            ("demographic", "demographic_results"),
+        ]:
+            df = pd.DataFrame(rs[key]).assign(**scenario)
+            paths.extend(self.append(name, df))
+        return paths
+
+    def append_simulation(self, rows):
+        """run_single_simulation 결과 행(list of dict 또는 DataFrame) 추가"""
+        return self.append("simulation", pd.DataFrame(rows))
+
+    def append(self, name, df):
+        """DataFrame을 스키마로 변환하여 파티션별 새 part 파일로 저장, 파일 경로 목록 반환"""
+        pa = _require_pyarrow()
+        if len(df) == 0:
+            return []
+
+        df = df.copy()
+        for column in RATE_COLUMNS:
+            if column in df:
+                df[column] = df[column].astype(float).round(RATE_DIGITS)
+
+        full = schema(name)
+        partition_columns = list(PARTITIONS[name])
+        data_schema = pa.schema(
+            [field for field in full if field.name not in partition_columns]
+        )
+
+        paths = []
+        for values, group in df.groupby(partition_columns, sort=False):
+            values = values if isinstance(values, tuple) else (values,)
+            directory = os.path.join(
+                self.root,
+                name,
+                *(f"{c}={_round_rate(v)!r}" for c, v in zip(partition_columns, values)),
+            )
+            table = pa.Table.from_pandas(
+                group[data_schema.names], schema=data_schema, preserve_index=False
+            )
+            paths.append(self._write_part(directory, table))
+        return paths
+
+    def _write_part(self, directory, table):
+        pa = _require_pyarrow()
+        os.makedirs(directory, exist_ok=True)
+        extension = "parquet" if self.fmt == PARQUET else "arrow"
+        part = len([f for f in os.listdir(directory) if f.endswith(extension)])
+        name = f"part-{part:05d}.{extension}"
+        path = os.path.join(directory, name)
+        tmp_path = os.path.join(directory, f".{name}.tmp")  # "."로 시작하면 읽기에서 제외
+
+        if self.fmt == PARQUET:
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, tmp_path, compression=self.compression)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            with pa.ipc.new_file(tmp_path, table.schema, options=options) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)  # 쓰다 만 파일은 읽히지 않도록
+        return path
+
+
+def read_results(root, name, fmt=PARQUET, columns=None, **partition_values):
+    """저장된 표를 pyarrow Table로 읽기 (파티션 열 값으로 필터, 예: contribution_rate=9.0)"""
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    dataset = ds.dataset(
+        os.path.abspath(os.path.join(root, name)),
+        format="parquet" if fmt == PARQUET else "ipc",
+        partitioning=_partitioning(name),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+    condition = None
+    for column, value in partition_values.items():
+        term = ds.field(column) == _round_rate(value)
+        condition = term if condition is None else condition & term
+
+    table = dataset.to_table(columns=columns, filter=condition)
+    # 분할 열을 스키마 순서대로 정렬
+    order = [c for c, _ in SCHEMAS[name] if c in table.column_names]
+    return table.select(order)
+
+
+def export_csv(root, name, path, fmt=PARQUET, **partition_values):
+    """저장된 표를 CSV(UTF-8 BOM)로 내보내기"""
+    table = read_results(root, name, fmt=fmt, **partition_values)
+    table.to_pandas().to_csv(path, encoding="utf-8-sig", index=False)
+    return path
+
+
+def test_results_io(tmp_dir=None):
+    """Parquet/Arrow 저장 후 읽은 값과 자료형 확인"""
+    import tempfile
+
+    from NPS_model import NationalPensionModel
+
+    rs = NationalPensionModel().run_projection_columnar()
+    rows = [
+        {
+            "contribution_rate": 0.07 * 100,
+            "income_replacement": 40.0,
+            "max_reserve": 1456.9,
+            "max_reserve_year": 2036,
+            "first_deficit_year": 2037,
+            "depletion_year": 2051,
+        },
+        {
+            "contribution_rate": 0.20 * 100,
+            "income_replacement": 40.0,
+            "max_reserve": 9999.9,
+            "max_reserve_year": 2093,
+            "first_deficit_year": None,
+            "depletion_year": None,
+        },
+    ]
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as root:
+        for fmt in (PARQUET, ARROW):
+            writer = ResultsWriter(os.path.join(root, fmt), fmt=fmt)
+            writer.write_projection(rs, 9.0, 40.0)
+            writer.write_projection(rs, 12.0, 40.0)
+            writer.append_simulation(rows[:1])
+            writer.append_simulation(rows[1:])
+
+            financial = read_results(writer.root, "financial", fmt, contribution_rate=9.0)
+            assert financial.schema.equals(schema("financial")), financial.schema
+            np.testing.assert_array_equal(
+                financial["nominal_reserve_fund"].to_numpy(),
+                rs["financial_results"]["nominal_reserve_fund"].to_numpy(),
+            )
+
+            simulation = read_results(writer.root, "simulation", fmt).to_pandas()
+            simulation = simulation.sort_values("contribution_rate")
+            assert simulation["contribution_rate"].tolist() == [7.0, 20.0]
+            assert simulation["depletion_year"].isna().tolist() == [False, True]
+    print("열 단위 결과 저장/읽기가 정상 동작합니다.")
@@ -0,0 +1,295 @@
+"""단계 의존관계(DAG)에 따라 바뀐 단계만 다시 계산하는 시나리오 실행기
+
+추계는 인구 → 가입자 → 급여 → 재정 단계로 이어지고 경제 단계가 재정에 들어간다.
+각 단계의 키는 그 단계가 읽는 가정과 선행 단계 키의 해시이므로, 보험료율만 바뀐
+시나리오는 재정 단계만, 출산율이 바뀐 시나리오는 인구/가입자/급여/재정 단계만 다시
+계산하고 나머지는 저장된 단계 결과를 재사용한다.
+
+    executor = ScenarioExecutor()
+    results = executor.run_batch([
+        {"finance.contribution_rate": 0.12},
+        {"demographic.fertility_rate": {2023: 0.73, 2050: 1.4}},
+        {"finance.real_investment_return": {2023: 0.03}},
+    ])
+    executor.stats()  # 단계별 계산/재사용 횟수
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from NPS_model import NationalPensionModel, _canonical, projection_frames
+from tracing import stage
+
+
+class Stage:
+    """추계 단계: 선행 단계(deps), 단계가 읽는 가정(params(model)), 계산(run)
+
+    params의 DataFrame 값(초기 인구구조 등)은 실행기가 내용 해시로 바꿔 키에 넣는다.
+    run(model, years, inputs)의 inputs는 {선행 단계 이름: 결과} dict이다.
+    결과는 여러 시나리오가 공유하므로 run에서 inputs를 수정하지 않는다.
+    """
+
+    __slots__ = ("name", "deps", "params", "run")
+
+    def __init__(self, name, deps, params, run):
+        self.name = name
+        self.deps = tuple(deps)
+        self.params = params
+        self.run = run
+
+
+STAGES = [
+    Stage(
+        "demographic",
+        deps=(),
+        params=lambda m: {
+            "params": m.demographic.params,
+            "initial_population": m.demographic.population_structure,
+        },
+        run=lambda m, years, inputs: m.project_demographic_path(years),
+    ),
+    Stage(
+        "economic",
+        deps=(),
+        params=lambda m: {
+            "params": m.economic.params,
+            "base_values": m.economic.base_values,
+            "common": m.common.common_params,
+        },
+        run=lambda m, years, inputs: m.economic.project_variables_path(years),
+    ),
+    Stage(
+        "subscriber",
+        deps=("demographic",),
+        params=lambda m: {
+            "params": m.subscriber.params,
+            "common": m.common.common_params,
+        },
+        run=lambda m, years, inputs: m.subscriber.project_subscribers_path(
+            years, inputs["demographic"]["population"]
+        ),
+    ),
+    Stage(
+        "benefit",
+        deps=("demographic", "subscriber"),
+        params=lambda m: {
+            "params": m.benefit.params,
+            "common": m.common.common_params,
+        },
+        run=lambda m, years, inputs: m.benefit.project_benefits_path(
+            years, inputs["demographic"]["population"], inputs["subscriber"]
+        ),
+    ),
+    Stage(
+        "finance",
+        deps=("subscriber", "benefit", "economic"),
+        params=lambda m: {
+            "params": m.finance.params,
+            "initial_reserve_fund": m.finance.initial_reserve_fund,
+            "common": m.common.common_params,
+        },
+        run=lambda m, years, inputs: m.finance.project_balance_path(
+            years, inputs["subscriber"], inputs["benefit"], inputs["economic"]
+        ),
+    ),
+]
+
+
+def topological_order(stages):
+    """선행 단계가 먼저 오도록 정렬한 단계 이름 목록 (순환이 있으면 ValueError)"""
+    deps = {s.name: set(s.deps) for s in stages}
+    missing = {d for ds in deps.values() for d in ds} - set(deps)
+    if missing:
+        raise ValueError(f"정의되지 않은 선행 단계: {sorted(missing)}")
+
+    order = []
+    ready = [s.name for s in stages if not s.deps]
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for other, other_deps in deps.items():
+            if name in other_deps:
+                other_deps.discard(name)
+                if not other_deps and other not in order and other not in ready:
+                    ready.append(other)
+    if len(order) != len(stages):
+        raise ValueError("단계 의존관계에 순환이 있습니다.")
+    return order
+
+
+MODULES = ("common", "demographic", "economic", "subscriber", "benefit", "finance")
+
+
+def apply_overrides(model, overrides):
+    """{"모듈.가정": 값} 형식의 가정 변경을 model에 적용 (예: "finance.contribution_rate")"""
+    for path, value in overrides.items():
+        module, _, key = path.partition(".")
+        if module not in MODULES:
+            raise ValueError(f"알 수 없는 모듈: {path}")
+        params = (
+            model.common.common_params
+            if module == "common"
+            else getattr(model, module).params
+        )
+        if key not in params:
+            raise ValueError(f"알 수 없는 가정: {path}")
+        params[key] = value
+    return model
+
+
+class ScenarioExecutor:
+    """단계 결과를 입력 해시로 저장해 재사용하는 추계 실행기 (크기 제한 LRU)
+
+    run(model)은 model.run_projection_columnar()와 같은 결과를 반환한다.
+    """
+
+    def __init__(self, stages=STAGES, maxsize=256):
+        self.stages = {s.name: s for s in stages}
+        self.order = topological_order(stages)
+        self.maxsize = maxsize
+        self._outputs = OrderedDict()
+        self._lock = threading.Lock()
+        self._frame_hash = (None, None)  # (마지막으로 해시한 DataFrame 객체, 해시)
+        self.computed = dict.fromkeys(self.order, 0)
+        self.reused = dict.fromkeys(self.order, 0)
+
+    def stage_keys(self, model):
+        """단계별 키 (단계 가정, 추계 연도, 선행 단계 키의 해시)"""
+        keys = {}
+        for name in self.order:
+            spec = self.stages[name]
+            canonical = json.dumps(
+                {
+                    "stage": name,
+                    "years": [model.start_year, model.end_year],
+                    "params": _canonical(self._hash_frames(spec.params(model))),
+                    "deps": [keys[dep] for dep in spec.deps],
+                },
+                sort_keys=True,
+            )
+            keys[name] = hashlib.sha256(canonical.encode()).hexdigest()
+        return keys
+
+    def _hash_frames(self, params):
+        """params dict의 DataFrame 값을 내용 해시로 바꾼 dict
+
+        같은 객체면 다시 해시하지 않으므로 DataFrame은 제자리에서 수정하지 말고 새 객체로
+        교체한다 (run_batch는 시나리오 간 초기 인구구조 객체를 공유).
+        """
+        hashed = {}
+        for name, value in params.items():
+            if isinstance(value, pd.DataFrame):
+                with self._lock:
+                    cached_frame, digest = self._frame_hash
+                if cached_frame is not value:
+                    digest = pd.util.hash_pandas_object(value, index=False).tolist()
+                    with self._lock:
+                        self._frame_hash = (value, digest)
+                value = digest
+            hashed[name] = value
+        return hashed
+
+    def run_stages(self, model):
+        """단계별 결과 dict ({단계 이름: 결과}), 저장된 단계는 다시 계산하지 않음"""
+        years = np.arange(model.start_year, model.end_year + 1)
+        keys = self.stage_keys(model)
+        outputs = {}
+        for name in self.order:
+            key = keys[name]
+            with self._lock:
+                output = self._outputs.get(key)
+                if output is not None:
+                    self._outputs.move_to_end(key)
+                    self.reused[name] += 1
+            if output is None:
+                spec = self.stages[name]
+                with stage(name):
+                    output = spec.run(
+                        model, years, {dep: outputs[dep] for dep in spec.deps}
+                    )
+                self._remember(key, output)
+                with self._lock:
+                    self.computed[name] += 1
+            outputs[name] = output
+        return outputs
+
+    def run(self, model):
+        """재정추계 결과 (run_projection_columnar와 같은 DataFrame dict)"""
+        outputs = self.run_stages(model)
+        return projection_frames(
+            np.arange(model.start_year, model.end_year + 1),
+            outputs["demographic"]["indicators"],
+            outputs["subscriber"],
+            outputs["finance"],
+        )
+
+    def run_batch(self, scenarios):
+        """가정 변경 dict 목록(apply_overrides 형식)의 시나리오별 결과 목록
+
+        시나리오마다 새 모델에 가정을 적용하며, 초기 인구구조는 첫 모델의 것을 함께 쓴다.
+        """
+        results = []
+        population_structure = None
+        for overrides in scenarios:
+            model = NationalPensionModel()
+            if population_structure is None:
+                population_structure = model.demographic.population_structure
+            model.demographic.population_structure = population_structure
+            results.append(self.run(apply_overrides(model, overrides)))
+        return results
+
+    def _remember(self, key, output):
+        with self._lock:
+            self._outputs[key] = output
+            self._outputs.move_to_end(key)
+            if len(self._outputs) > self.maxsize:
+                self._outputs.popitem(last=False)
+
+    def stats(self):
+        """단계별 계산/재사용 횟수 DataFrame"""
+        return pd.DataFrame(
+            {"computed": self.computed, "reused": self.reused}
+        ).rename_axis("stage")
+
+
+def test_scenario_executor():
+    """정책 × 출산율 × 수익률 시나리오에서 바뀐 단계만 계산하고 결과가 같은지 확인"""
+    fertility = NationalPensionModel().demographic.params["fertility_rate"]
+    scenarios = [
+        {
+            "finance.contribution_rate": contribution_rate,
+            "demographic.fertility_rate": {y: v * shock for y, v in fertility.items()},
+            "finance.real_investment_return": {2023: real_return},
+        }
+        for contribution_rate in (0.09, 0.12)
+        for shock in (1.0, 1.2)
+        for real_return in (0.02, 0.03)
+    ]
+
+    executor = ScenarioExecutor()
+    results = executor.run_batch(scenarios)
+    for overrides, result in zip(scenarios, results):
+        expected = apply_overrides(
+            NationalPensionModel(), overrides
+        ).run_projection_columnar()
+        for key in ["financial_results", "demographic_results"]:
+            pd.testing.assert_frame_equal(result[key], expected[key])
+
+    # 인구/가입자/급여는 출산율 2가지, 경제는 1번, 재정은 8개 시나리오 모두 계산
+    assert executor.computed == {
+        "demographic": 2,
+        "economic": 1,
+        "subscriber": 2,
+        "benefit": 2,
+        "finance": 8,
+    }, executor.computed
+
+    # 같은 시나리오를 다시 실행하면 모두 재사용
+    executor.run_batch(scenarios[:1])
+    assert executor.computed["finance"] == 8 and executor.reused["finance"] == 1
+    print("시나리오 실행기가 바뀐 단계만 다시 계산합니다.")
@@ -1,5 +1,13 @@
 from NPS_model import NationalPensionModel
-from visualization import create_simulation_visualizations
+from finance_module import RETURN_MODELS, reserve_fund_tangent, simulate_return_paths
+import tracing
+from tracing import stage
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+import argparse
+import math
+import os
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -8,71 +16,642 @@ now = datetime.now()
 timestamp = now.strftime("%d%H%M")
 
 
-def run_single_simulation(contribution_rate, income_replacement):
+def run_single_simulation(
+    contribution_rate,
+    income_replacement,
+    model=None,
+    stop_at_depletion=True,
+    cache=None,
+):
+    """보험료율/소득대체율 시나리오의 최대 적립금, 최초 적자, 기금 소진 연도
 
-    # 모델 초기화
-    model = NationalPensionModel()
+    stop_at_depletion=True이면 기금이 소진된 해에서 추계를 멈춘다 (summarize_records 참고).
+    cache(projection_cache.ProjectionCache)를 주면 전 기간 추계 결과를 저장/재사용한다.
+    """
+
+    # 모델 초기화 (재사용 모델은 적립금만 초기화, 인구추계 등은 캐시 재사용)
+    if model is None:
+        model = NationalPensionModel()
+    else:
+        model.finance.reserve_fund = model.finance.initial_reserve_fund
 
     # 보험료율과 소득대체율 설정
     model.finance.params["contribution_rate"] = contribution_rate
     model.benefit.params["income_replacement"] = income_replacement
 
-    # 시뮬레이션 실행
+    # 시뮬레이션 실행 (연도별 결과를 받는 대로 요약)
+    if cache is not None:
+        records = cache.run(model)["financial_results"]
+    else:
+        records = (record["financial"] for record in model.iter_projection())
+    with stage("summarize"):
+        return summarize_records(records, stop_at_depletion=stop_at_depletion)
+
+
+def summarize_records(financial_records, stop_at_depletion=True):
+    """연도별 재정수지 결과를 차례로 받아 최대 적립금, 최초 적자, 기금 소진 연도 요약
+
+    stop_at_depletion=True이면 기금 소진 연도에서 더 받지 않는다. 적립금은 0 아래로
+    내려가지 않고 수지적자 없이는 줄지 않으므로 최초 적자/소진 연도는 그대로이며,
+    최대 적립금은 소진 후 다시 최고치를 넘지 않는다고 보고 그때까지의 값을 쓴다
+    (test_summarize_records에서 기본 격자 전체에 대해 확인).
+    """
+    max_reserve = None
+    max_reserve_year = None
+    first_deficit_year = None
+    depletion_year = None
+
+    for financial_status in financial_records:
+        year = financial_status["year"]
+        reserve_fund = financial_status["nominal_reserve_fund"]
+
+        # 최대 적립금 및 해당 연도 (같은 값이면 앞선 연도)
+        if max_reserve is None or reserve_fund > max_reserve:
+            max_reserve, max_reserve_year = reserve_fund, year
+
+        # 최초 수지적자 연도
+        if first_deficit_year is None and financial_status["nominal_balance"] <= 0:
+            first_deficit_year = year
+
+        # 기금 소진 연도
+        if depletion_year is None and reserve_fund <= 0:
+            depletion_year = year
+            if stop_at_depletion:
+                break
+
+    return {
+        "max_reserve": round(max_reserve / 1e8, 1),  # 조원 단위, 소수점 첫째자리까지
+        "max_reserve_year": int(max_reserve_year),
+        "first_deficit_year": int(first_deficit_year) if first_deficit_year else None,
+        "depletion_year": int(depletion_year) if depletion_year else None,
+    }
+
+
+def test_summarize_records():
+    """기금 소진 연도에서 멈춘 요약이 전 기간 요약과 같은지 기본 격자 전체에서 확인"""
+    model = NationalPensionModel()
+    for cont_rate in np.arange(0.07, 0.16, 0.01).round(2):
+        for inc_replace in np.arange(0.40, 0.51, 0.01).round(2):
+            full = run_single_simulation(
+                cont_rate, inc_replace, model=model, stop_at_depletion=False
+            )
+            early = run_single_simulation(cont_rate, inc_replace, model=model)
+            assert early == full, (cont_rate, inc_replace, early, full)
+    print("기금 소진 시점에서 멈춘 요약이 전 기간 요약과 일치합니다.")
+
+
+def summarize_reserve_paths(years, nominal_reserve_fund, nominal_balance):
+    """(..., 연도) 적립금/수지 경로에서 최대 적립금, 최초 적자, 소진 연도를 배열로 계산
+
+    해당 연도가 없으면 np.nan (run_single_simulation의 None)
+    """
+    max_idx = nominal_reserve_fund.argmax(axis=-1)
+    max_reserve = np.take_along_axis(nominal_reserve_fund, max_idx[..., None], -1)
+
+    return {
+        "max_reserve": max_reserve[..., 0] / 1e8,  # 조원 단위
+        "max_reserve_year": years[max_idx],
+        "first_deficit_year": _first_year(years, nominal_balance <= 0),
+        "depletion_year": _first_year(years, nominal_reserve_fund <= 0),
+    }
+
+
+def _first_year(years, mask):
+    return np.where(mask.any(axis=-1), years[mask.argmax(axis=-1)], np.nan)
+
+
+def run_policy_grid(contribution_rates, income_replacements, max_cells=20000):
+    """보험료율 × 소득대체율 격자 전체를 한 번의 배열 계산으로 시뮬레이션
+
+    정책과 무관한 인구/경제/가입자 추계는 한 번만 하고, 보험료 수입과 급여지출만
+    격자 축으로 확장하여 적립금 점화식을 모든 셀에 대해 동시에 계산한다.
+    메모리 사용량은 한 번에 계산하는 셀 수(max_cells)로 제한한다.
+
+    반환값은 (보험료율 × 소득대체율) 배열의 dict
+    (max_reserve, max_reserve_year, first_deficit_year, depletion_year)
+    """
+    contribution_rates = np.asarray(contribution_rates, dtype=float)
+    income_replacements = np.asarray(income_replacements, dtype=float)
+
+    model = NationalPensionModel()
+    base = model.project_base_paths()
+    years, subscribers = base["years"], base["subscribers"]
+
+    with stage("benefit"):
+        benefits = model.benefit.project_benefits_path(
+            years,
+            base["population"],
+            subscribers,
+            income_replacement=income_replacements[:, None],
+        )
+
+    shape = (len(contribution_rates), len(income_replacements))
+    grid = {
+        "max_reserve": np.empty(shape),
+        "max_reserve_year": np.empty(shape, dtype=int),
+        "first_deficit_year": np.empty(shape),
+        "depletion_year": np.empty(shape),
+    }
+
+    rows = max(1, max_cells // len(income_replacements))
+    for start in range(0, len(contribution_rates), rows):
+        chunk = slice(start, start + rows)
+        with stage("finance", chunk=start // rows):
+            financial_status = model.finance.project_balance_path(
+                years,
+                subscribers,
+                benefits,
+                base["economic_vars"],
+                contribution_rate=contribution_rates[chunk, None, None],
+            )
+        with stage("summarize", chunk=start // rows):
+            summary = summarize_reserve_paths(
+                years,
+                financial_status["nominal_reserve_fund"],
+                financial_status["nominal_balance"],
+            )
+        for key, values in summary.items():
+            grid[key][chunk] = values
+
+    return grid
+
+
+def policy_grid_to_frame(contribution_rates, income_replacements, grid):
+    """run_policy_grid 결과를 run_multiple_simulations와 같은 형식의 DataFrame으로 변환"""
     results = []
-    for year in range(model.start_year, model.end_year + 1):
-        # 1. 인구추계
-        population_data = model.demographic.project_population(year)
+    for i, cont_rate in enumerate(contribution_rates):
+        for j, inc_replace in enumerate(income_replacements):
+            first_deficit_year = grid["first_deficit_year"][i, j]
+            depletion_year = grid["depletion_year"][i, j]
+            results.append(
+                {
+                    "contribution_rate": cont_rate * 100,  # 퍼센트로 변환
+                    "income_replacement": inc_replace * 100,  # 퍼센트로 변환
+                    "max_reserve": round(float(grid["max_reserve"][i, j]), 1),
+                    "max_reserve_year": int(grid["max_reserve_year"][i, j]),
+                    "first_deficit_year": (
+                        None if np.isnan(first_deficit_year) else int(first_deficit_year)
+                    ),
+                    "depletion_year": (
+                        None if np.isnan(depletion_year) else int(depletion_year)
+                    ),
+                }
+            )
+
+    return pd.DataFrame(results)
+
 
-        # 2. 거시경제변수 추계
-        economic_vars = model.economic.project_variables(year)
+def test_policy_grid():
+    """격자 계산 결과를 셀별 run_single_simulation 결과와 비교"""
+    contribution_rates = [0.07, 0.09, 0.12, 0.15]
+    income_replacements = [0.40, 0.45, 0.50]
+    grid = run_policy_grid(contribution_rates, income_replacements)
 
-        # 3. 가입자 추계
-        subscribers = model.subscriber.project_subscribers(
-            year, population_data["population_structure"]
+    for i, cont_rate in enumerate(contribution_rates):
+        for j, inc_replace in enumerate(income_replacements):
+            expected = run_single_simulation(cont_rate, inc_replace)
+            for key in ["max_reserve_year", "first_deficit_year", "depletion_year"]:
+                value = grid[key][i, j]
+                value = None if np.isnan(value) else int(value)
+                assert value == expected[key], (cont_rate, inc_replace, key)
+            assert abs(grid["max_reserve"][i, j] - expected["max_reserve"]) <= 0.05
+    print("격자 계산 결과가 셀별 시뮬레이션 결과와 일치합니다.")
+
+
+def run_return_monte_carlo(
+    contribution_rate=0.09,
+    income_replacement=0.40,
+    n_paths=100_000,
+    return_model="normal",
+    seed=None,
+    max_paths=10_000,
+    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+    keep_paths=False,
+    **model_params,
+):
+    """확률적 실질투자수익률 경로 n_paths개에 대한 적립금 몬테카를로 시뮬레이션
+
+    인구/경제/가입자/급여 추계는 한 번만 하고, 수익률 경로(finance_module.simulate_return_paths,
+    return_model: "normal", "ar1", "regime", model_params로 모수 변경)를 경로 축으로 묶어
+    적립금 점화식을 max_paths개씩 한 번에 계산한다.
+
+    반환값:
+        depletion_year, max_reserve(조원), max_reserve_year: 경로별 (n_paths,) 배열
+            (소진되지 않으면 depletion_year는 np.nan)
+        depletion_probability: 연도별 그 해까지 기금이 소진된 경로 비율
+        fund_ratio_quantiles: 연도 × 분위수 적립배율 DataFrame
+        summary: 지표 × 분위수 DataFrame (소진되지 않은 경로의 소진 연도는 inf로 두고 계산)
+        deterministic: params의 평균 수익률 경로 결과 (run_single_simulation과 같은 값)
+        fund_ratio: 경로별 적립배율 (n_paths × 연도, float32, keep_paths=True일 때)
+    """
+    model = NationalPensionModel()
+    model.finance.params["contribution_rate"] = contribution_rate
+    model.benefit.params["income_replacement"] = income_replacement
+    base = model.project_base_paths()
+    years, subscribers = base["years"], base["subscribers"]
+    with stage("benefit"):
+        benefits = model.benefit.project_benefits_path(
+            years, base["population"], subscribers
         )
 
-        # 4. 급여지출 추계
-        benefits = model.benefit.project_benefits(
-            year,
-            population_data["population_structure"],
-            subscribers,
+    def project(real_return=None):
+        return model.finance.project_balance_path(
+            years, subscribers, benefits, base["economic_vars"], real_return=real_return
         )
 
-        # 5. 재정수지 추계
-        financial_status = model.finance.project_balance(
-            year, subscribers, benefits, economic_vars
+    deterministic = project()
+    mean_returns = model.finance._get_real_investment_return_path(years)
+    rng = np.random.default_rng(seed)
+
+    depletion_year = np.empty(n_paths)
+    max_reserve = np.empty(n_paths)
+    max_reserve_year = np.empty(n_paths, dtype=int)
+    fund_ratio = np.empty((n_paths, len(years)), dtype=np.float32)
+
+    for start in range(0, n_paths, max_paths):
+        chunk = slice(start, min(start + max_paths, n_paths))
+        with stage("returns", chunk=start // max_paths):
+            real_return = simulate_return_paths(
+                mean_returns,
+                chunk.stop - chunk.start,
+                model=return_model,
+                rng=rng,
+                **model_params,
+            )
+        with stage("finance", chunk=start // max_paths):
+            financial_status = project(real_return)
+        with stage("summarize", chunk=start // max_paths):
+            summary = summarize_reserve_paths(
+                years,
+                financial_status["nominal_reserve_fund"],
+                financial_status["nominal_balance"],
+            )
+        depletion_year[chunk] = summary["depletion_year"]
+        max_reserve[chunk] = summary["max_reserve"]
+        max_reserve_year[chunk] = summary["max_reserve_year"]
+        fund_ratio[chunk] = financial_status["fund_ratio"]
+
+    quantiles = list(quantiles)
+    never_depleted = np.where(np.isnan(depletion_year), np.inf, depletion_year)
+    summary = pd.DataFrame(
+        {
+            "depletion_year": np.quantile(never_depleted, quantiles),
+            "max_reserve": np.quantile(max_reserve, quantiles),
+            "max_reserve_year": np.quantile(max_reserve_year, quantiles),
+        },
+        index=pd.Index(quantiles, name="quantile"),
+    ).T
+
+    result = {
+        "years": years,
+        "n_paths": n_paths,
+        "return_model": return_model,
+        "depletion_year": depletion_year,
+        "max_reserve": max_reserve,
+        "max_reserve_year": max_reserve_year,
+        "depletion_probability": (never_depleted[:, None] <= years).mean(axis=0),
+        "fund_ratio_quantiles": pd.DataFrame(
+            np.quantile(fund_ratio, quantiles, axis=0).T,
+            index=pd.Index(years, name="year"),
+            columns=quantiles,
+        ),
+        "summary": summary,
+        "deterministic": summarize_reserve_paths(
+            years,
+            deterministic["nominal_reserve_fund"],
+            deterministic["nominal_balance"],
+        ),
+    }
+    if keep_paths:
+        result["fund_ratio"] = fund_ratio
+    return result
+
+
+def test_return_monte_carlo():
+    """변동성 0이면 결정적 추계와 같고, seed가 같으면 같은 결과인지 확인"""
+    expected = run_single_simulation(0.09, 0.40)
+    for return_model, params in [
+        ("normal", {"sigma": 0.0}),
+        ("ar1", {"sigma": 0.0}),
+        ("regime", {"offset": (0.0, 0.0), "sigma": (0.0, 0.0)}),
+    ]:
+        result = run_return_monte_carlo(
+            n_paths=5, return_model=return_model, max_paths=2, seed=0, **params
         )
+        assert set(result["depletion_year"]) == {expected["depletion_year"]}
+        assert set(result["max_reserve_year"]) == {expected["max_reserve_year"]}
+        np.testing.assert_allclose(result["max_reserve"], expected["max_reserve"], atol=0.05)
+
+    first = run_return_monte_carlo(n_paths=2000, return_model="regime", seed=42)
+    again = run_return_monte_carlo(n_paths=2000, return_model="regime", seed=42)
+    np.testing.assert_array_equal(first["depletion_year"], again["depletion_year"])
+    probability = first["depletion_probability"]
+    assert np.all(np.diff(probability) >= 0) and 0 < probability[-1] <= 1
+    print("투자수익률 몬테카를로 시뮬레이션이 정상 동작합니다.")
+
 
-        results.append(financial_status)
+class PolicySolver:
+    """목표(기금 유지 연도/적립배율)를 만족하는 보험료율 또는 소득대체율 탐색 (이분법)
 
-    # 결과 분석
-    df = pd.DataFrame(results)
+    정책과 무관한 인구/경제/가입자 추계는 생성 시 한 번만 계산하고,
+    반복마다 급여지출과 적립금 점화식만 다시 계산한다.
+    목표: through_year까지 적립금 > 0 (min_fund_ratio=None)
+          또는 through_year까지 적립배율(fund_ratio) >= min_fund_ratio
+    """
 
-    # 최대 적립금 및 해당 연도 찾기
-    max_reserve_idx = df["nominal_reserve_fund"].idxmax()
-    max_reserve = df.loc[max_reserve_idx, "nominal_reserve_fund"] / 1e8  # 조원 단위
-    max_reserve_year = df.loc[max_reserve_idx, "year"]
+    def __init__(self):
+        self.model = NationalPensionModel()
+        self.base = self.model.project_base_paths()
+        self.years = self.base["years"]
+
+    def project(self, contribution_rate, income_replacement):
+        """정책 조합의 재정수지 경로 (project_balance_path 결과)"""
+        benefits = self.model.benefit.project_benefits_path(
+            self.years,
+            self.base["population"],
+            self.base["subscribers"],
+            income_replacement=income_replacement,
+        )
+        return self.model.finance.project_balance_path(
+            self.years,
+            self.base["subscribers"],
+            benefits,
+            self.base["economic_vars"],
+            contribution_rate=contribution_rate,
+        )
+
+    def meets_target(self, financial_status, through_year, min_fund_ratio=None):
+        window = self.years <= through_year
+        if min_fund_ratio is None:
+            return bool(np.all(financial_status["nominal_reserve_fund"][window] > 0))
+        return bool(np.all(financial_status["fund_ratio"][window] >= min_fund_ratio))
+
+    def solve_contribution_rate(
+        self,
+        income_replacement,
+        through_year,
+        min_fund_ratio=None,
+        bounds=(0.0, 0.5),
+        tol=1e-6,
+    ):
+        """목표를 만족하는 최소 보험료율"""
+        return self._bisect(
+            lambda rate: self.project(rate, income_replacement),
+            through_year,
+            min_fund_ratio,
+            bounds,
+            tol,
+            increasing=True,
+        )
 
-    # 최초 수지적자 연도 찾기
-    deficit_mask = df["nominal_balance"] <= 0
-    first_deficit_year = (
-        df[deficit_mask]["year"].iloc[0] if deficit_mask.any() else None
+    def solve_income_replacement(
+        self,
+        contribution_rate,
+        through_year,
+        min_fund_ratio=None,
+        bounds=(0.0, 1.0),
+        tol=1e-6,
+    ):
+        """목표를 만족하는 최대 소득대체율"""
+        return self._bisect(
+            lambda rate: self.project(contribution_rate, rate),
+            through_year,
+            min_fund_ratio,
+            bounds,
+            tol,
+            increasing=False,
+        )
+
+    def _bisect(self, project, through_year, min_fund_ratio, bounds, tol, increasing):
+        """increasing=True면 값이 클수록 목표 달성이 쉬운 경우 (보험료율)"""
+        lo, hi = bounds
+        feasible, infeasible = (hi, lo) if increasing else (lo, hi)
+
+        if not self.meets_target(project(feasible), through_year, min_fund_ratio):
+            raise ValueError(f"탐색 범위 {bounds}에서 목표를 만족하는 값이 없습니다.")
+        if self.meets_target(project(infeasible), through_year, min_fund_ratio):
+            return infeasible
+
+        while abs(feasible - infeasible) > tol:
+            mid = (feasible + infeasible) / 2
+            if self.meets_target(project(mid), through_year, min_fund_ratio):
+                feasible = mid
+            else:
+                infeasible = mid
+        return feasible
+
+
+def test_policy_solver(tol=1e-5):
+    """풀이한 정책값이 목표를 만족하고 tol만큼 벗어나면 만족하지 않는지 연도별 추계로 확인"""
+    solver = PolicySolver()
+
+    # 소득대체율 45%에서 2090년까지 기금을 유지하는 최소 보험료율
+    rate = solver.solve_contribution_rate(0.45, through_year=2090, tol=tol)
+    assert run_single_simulation(rate, 0.45)["depletion_year"] > 2090, rate
+    assert run_single_simulation(rate - tol, 0.45)["depletion_year"] <= 2090, rate
+
+    # 보험료율 13%에서 2080년까지 적립배율 5 이상을 유지하는 최대 소득대체율
+    def min_fund_ratio(contribution_rate, income_replacement):
+        model = NationalPensionModel()
+        model.finance.params["contribution_rate"] = contribution_rate
+        model.benefit.params["income_replacement"] = income_replacement
+        return min(
+            record["fund_ratio"]
+            for record in model.run_projection()["financial_results"]
+            if record["year"] <= 2080
+        )
+
+    replacement = solver.solve_income_replacement(
+        0.13, through_year=2080, min_fund_ratio=5, tol=tol
     )
+    assert min_fund_ratio(0.13, replacement) >= 5, replacement
+    assert min_fund_ratio(0.13, replacement + tol) < 5, replacement
+
+    # 탐색 범위의 하한이 이미 목표를 만족하면 하한을 그대로 반환
+    assert solver.solve_contribution_rate(0.40, 2040, bounds=(0.09, 0.5)) == 0.09
+    assert solver.solve_income_replacement(0.09, 2030, bounds=(0.4, 0.5)) == 0.5
+
+    # 탐색 범위 안에 목표를 만족하는 값이 없으면 ValueError
+    for solve, args, bounds in [
+        (solver.solve_contribution_rate, (0.45, 2090), (0.0, 0.1)),
+        (solver.solve_income_replacement, (0.05, 2090), (0.9, 1.0)),
+    ]:
+        try:
+            solve(*args, bounds=bounds)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{solve.__name__}{bounds}: ValueError가 없습니다.")
+    print("정책변수 풀이 결과가 목표를 정확히 만족합니다.")
+
 
-    # 기금 소진 연도 찾기
-    depletion_mask = df["nominal_reserve_fund"] <= 0
-    depletion_year = (
-        df[depletion_mask]["year"].iloc[0] if depletion_mask.any() else None
+def run_policy_points(contribution_rates, income_replacements, solver=None):
+    """(보험료율, 소득대체율) 점 목록을 한 번의 배열 계산으로 시뮬레이션
+
+    반환값은 점별 배열의 dict (summarize_reserve_paths 형식)
+    """
+    solver = PolicySolver() if solver is None else solver
+    financial_status = solver.project(
+        np.asarray(contribution_rates, dtype=float)[:, None],
+        np.asarray(income_replacements, dtype=float)[:, None],
+    )
+    return summarize_reserve_paths(
+        solver.years,
+        financial_status["nominal_reserve_fund"],
+        financial_status["nominal_balance"],
     )
 
+
+def run_adaptive_sweep(
+    contribution_range=(0.07, 0.15),
+    replacement_range=(0.40, 0.50),
+    initial_shape=(9, 11),
+    max_depth=4,
+    levels=(2040, 2050, 2060),
+    keys=("depletion_year", "first_deficit_year"),
+):
+    """적자/소진 연도가 바뀌는 셀만 세분하는 적응형(쿼드트리) 정책평면 탐색
+
+    initial_shape 격자에서 시작해, 네 꼭짓점의 keys 연도가 levels 중 하나를 사이에 두고
+    갈리는 셀만 max_depth번까지 4등분한다 (levels=None이면 연도가 달라지는 모든 셀).
+    최종 해상도는 초기 간격의 1/2**max_depth이다. 미발생(None) 연도는 level 초과로 본다.
+    기본 범위와 초기 격자는 run_multiple_simulations와 같은 1%p 간격(보험료율 7-15%,
+    소득대체율 40-50%)이다.
+
+    반환: points (계산한 점들의 DataFrame, run_multiple_simulations 형식),
+          contours ((key, level) -> 해당 연도 경계를 지나는 최소 셀 중심점 (N × 2) 배열),
+          n_evaluations, dense_evaluations (같은 해상도 전체 격자의 계산 수)
+    """
+    solver = PolicySolver()
+    scale = 2**max_depth
+    n_c, n_r = [(n - 1) * scale + 1 for n in initial_shape]
+    contribution_rates = np.linspace(*contribution_range, n_c)
+    income_replacements = np.linspace(*replacement_range, n_r)
+    values = {}  # 격자 좌표 (i, j) -> 결과
+
+    def evaluate(points):
+        points = [point for point in dict.fromkeys(points) if point not in values]
+        if not points:
+            return
+        i, j = np.array(points).T
+        summary = run_policy_points(
+            contribution_rates[i], income_replacements[j], solver
+        )
+        for k, point in enumerate(points):
+            values[point] = {key: summary[key][k] for key in summary}
+
+    def corners(cell, step):
+        i, j = cell
+        return [(i + di, j + dj) for di in (0, step) for dj in (0, step)]
+
+    def straddles(cell, step, key, level):
+        reached = [values[point][key] <= level for point in corners(cell, step)]
+        return any(reached) and not all(reached)
+
+    def needs_refinement(cell, step):
+        for key in keys:
+            if levels is None:
+                years = {_year_key(values[point][key]) for point in corners(cell, step)}
+                if len(years) > 1:
+                    return True
+            elif any(straddles(cell, step, key, level) for level in levels):
+                return True
+        return False
+
+    step = scale
+    cells = [(i, j) for i in range(0, n_c - 1, step) for j in range(0, n_r - 1, step)]
+    evaluate([(i, j) for i in range(0, n_c, step) for j in range(0, n_r, step)])
+    while step > 1:
+        changed = [cell for cell in cells if needs_refinement(cell, step)]
+        step //= 2
+        cells = [child for cell in changed for child in corners(cell, step)]
+        evaluate([point for cell in cells for point in corners(cell, step)])
+
+    # 최소 셀 중 네 꼭짓점이 level 이하/초과(또는 미발생)로 갈리는 셀의 중심
+    contours = {}
+    for key in keys:
+        for level in levels or ():
+            centers = [
+                (
+                    (contribution_rates[i] + contribution_rates[i + step]) / 2,
+                    (income_replacements[j] + income_replacements[j + step]) / 2,
+                )
+                for i, j in cells
+                if straddles((i, j), step, key, level)
+            ]
+            contours[(key, level)] = np.array(sorted(centers)).reshape(-1, 2)
+
+    points = []
+    for (i, j), result in sorted(values.items()):
+        points.append(
+            {
+                "contribution_rate": contribution_rates[i] * 100,  # 퍼센트로 변환
+                "income_replacement": income_replacements[j] * 100,  # 퍼센트로 변환
+                "max_reserve": round(float(result["max_reserve"]), 1),
+                "max_reserve_year": int(result["max_reserve_year"]),
+                "first_deficit_year": _year_or_none(result["first_deficit_year"]),
+                "depletion_year": _year_or_none(result["depletion_year"]),
+            }
+        )
+
     return {
-        "max_reserve": round(max_reserve, 1),  # 소수점 첫째자리까지 표시
-        "max_reserve_year": int(max_reserve_year),
-        "first_deficit_year": int(first_deficit_year) if first_deficit_year else None,
-        "depletion_year": int(depletion_year) if depletion_year else None,
+        "points": pd.DataFrame(points),
+        "contours": contours,
+        "n_evaluations": len(values),
+        "dense_evaluations": n_c * n_r,
     }
 
 
+def _year_key(year):
+    return -1 if np.isnan(year) else int(year)
+
+
+def _year_or_none(year):
+    return None if np.isnan(year) else int(year)
+
+
+def test_adaptive_sweep(max_depth=2):
+    """적응형 탐색의 연도 경계가 같은 해상도 전체 격자의 경계와 한 셀 이내로 일치하는지 확인"""
+    contribution_range, replacement_range = (0.07, 0.15), (0.40, 0.50)
+    adaptive = run_adaptive_sweep(max_depth=max_depth)
+    assert adaptive["n_evaluations"] < adaptive["dense_evaluations"]
+
+    scale = 2**max_depth
+    contribution_rates = np.linspace(*contribution_range, 8 * scale + 1)
+    income_replacements = np.linspace(*replacement_range, 10 * scale + 1)
+    cell_size = np.array(
+        [
+            contribution_rates[1] - contribution_rates[0],
+            income_replacements[1] - income_replacements[0],
+        ]
+    )
+    c, r = np.meshgrid(contribution_rates, income_replacements, indexing="ij")
+    dense = run_policy_points(c.ravel(), r.ravel())
+
+    for (key, level), adaptive_centers in adaptive["contours"].items():
+        reached = (dense[key] <= level).reshape(c.shape)  # 미발생(nan)은 level 초과
+        corners = np.stack(
+            [reached[:-1, :-1], reached[1:, :-1], reached[:-1, 1:], reached[1:, 1:]]
+        )
+        i, j = np.nonzero(corners.any(axis=0) & ~corners.all(axis=0))
+        dense_centers = np.column_stack(
+            [
+                (contribution_rates[i] + contribution_rates[i + 1]) / 2,
+                (income_replacements[j] + income_replacements[j + 1]) / 2,
+            ]
+        )
+        assert len(dense_centers) == 0 or len(adaptive_centers) > 0, (key, level)
+        pairs = [(dense_centers, adaptive_centers), (adaptive_centers, dense_centers)]
+        for a, b in pairs:
+            if len(a) == 0:
+                continue
+            # 각 경계 셀에서 가장 가까운 상대 경계 셀까지의 거리 (셀 단위)
+            distance = np.abs(a[:, None, :] - b[None, :, :]) / cell_size
+            nearest = distance.max(axis=-1).min(axis=1)
+            assert nearest.max() <= 1 + 1e-9, (key, level, nearest.max())
+    print("적응형 탐색의 연도 경계가 전체 격자 결과와 한 셀 이내로 일치합니다.")
+
+
 def run_pension_simulation(contribution_rate, income_replacement, sensitivity=True):
 
     # 기본 시뮬레이션 실행
@@ -172,6 +751,132 @@ def run_pension_simulation(contribution_rate, income_replacement, sensitivity=Tr
     return base_result
 
 
+def run_sensitivity_analysis(contribution_rate, income_replacement):
+    """적립금 경로의 가정별 민감도 (전진모드 미분, 추계 1회)
+
+    보험료율, 소득대체율, 실질투자수익률/수급률 가정 연도별 값에 대해
+    d(적립금 경로)/d(가정), 최대 적립금(조원), 최초 적자/기금 소진 연도의 미분을 계산한다.
+    연도 미분은 적자/소진 시점을 인접 연도 사이에서 선형보간한 연속값 기준이다.
+    """
+    model = NationalPensionModel()
+    model.finance.params["contribution_rate"] = contribution_rate
+    model.benefit.params["income_replacement"] = income_replacement
+
+    base = model.project_base_paths()
+    years, subscribers = base["years"], base["subscribers"]
+    benefits = model.benefit.project_benefits_path(
+        years, base["population"], subscribers
+    )
+    financial_status = model.finance.project_balance_path(
+        years, subscribers, benefits, base["economic_vars"]
+    )
+    real_expenditure = financial_status["real_expenditure"]
+    zeros = np.zeros(len(years))
+
+    # 가정별 (보험료수입, 지출, 실질투자수익률) 방향미분
+    tangents = {
+        "contribution_rate": (subscribers["total_income_real"], zeros, zeros),
+        "income_replacement": (zeros, real_expenditure / income_replacement, zeros),
+    }
+    return_schedule = model.common.schedule(
+        "real_investment_return", model.finance.params["real_investment_return"]
+    )
+    for year, weights in zip(*return_schedule.point_weights(years)):
+        tangents[f"real_investment_return[{year}]"] = (zeros, zeros, weights)
+
+    benefit_schedule = model.common.schedule(
+        "benefit_rate", model.benefit.params["benefit_rate"]
+    )
+    benefit_rate = benefit_schedule.rates(years)
+    for year, weights in zip(*benefit_schedule.point_weights(years)):
+        tangents[f"benefit_rate[{year}]"] = (
+            zeros,
+            real_expenditure * weights / benefit_rate,
+            zeros,
+        )
+
+    d_contribution, d_expenditure, d_return = (
+        np.array([tangent[i] for tangent in tangents.values()]) for i in range(3)
+    )
+    d_reserve_fund, d_nominal_balance = reserve_fund_tangent(
+        model.finance.initial_reserve_fund,
+        model.finance._get_real_investment_return_path(years),
+        model.common.get_cumulative_inflation_path(years),
+        financial_status["nominal_reserve_fund"],
+        d_contribution,
+        d_expenditure,
+        d_return,
+    )
+
+    reserve_fund = financial_status["nominal_reserve_fund"]
+    balance = financial_status["nominal_balance"]
+    max_idx = reserve_fund.argmax()
+
+    sensitivity = {}
+    for i, name in enumerate(tangents):
+        sensitivity[name] = {
+            "reserve_path": d_reserve_fund[i],
+            "max_reserve": d_reserve_fund[i, max_idx] / 1e8,  # 조원 단위
+            "first_deficit_year": _crossing_derivative(
+                balance, balance, d_nominal_balance[i], d_nominal_balance[i]
+            ),
+            "depletion_year": _crossing_derivative(
+                reserve_fund,
+                np.r_[reserve_fund[0], reserve_fund[:-1]] + balance,
+                d_reserve_fund[i],
+                np.r_[0.0, d_reserve_fund[i, :-1]] + d_nominal_balance[i],
+            ),
+        }
+
+    return {
+        "years": years,
+        "nominal_reserve_fund": reserve_fund,
+        "sensitivity": sensitivity,
+    }
+
+
+def _crossing_derivative(before, after, d_before, d_after):
+    """before[t-1] > 0 >= after[t]가 처음 성립하는 시점(선형보간)의 미분, 없으면 None"""
+    crossings = np.nonzero((before[:-1] > 0) & (after[1:] <= 0))[0]
+    if len(crossings) == 0:
+        return None
+    t = crossings[0]
+    a, b = before[t], after[t + 1]
+    return (a * d_after[t + 1] - b * d_before[t]) / (a - b) ** 2
+
+
+def test_sensitivity_analysis(h=1e-6):
+    """전진모드 민감도를 배열 추계의 중앙 유한차분과 비교"""
+    result = run_sensitivity_analysis(0.09, 0.40)
+
+    def reserve_path(contribution_rate=0.09, return_shift=0.0):
+        model = NationalPensionModel()
+        model.finance.params["contribution_rate"] = contribution_rate
+        model.finance.params["real_investment_return"][2040] += return_shift
+        return model.run_projection_columnar()["financial_results"][
+            "nominal_reserve_fund"
+        ].to_numpy()
+
+    checks = {
+        "contribution_rate": (
+            reserve_path(contribution_rate=0.09 + h)
+            - reserve_path(contribution_rate=0.09 - h)
+        ),
+        "real_investment_return[2040]": (
+            reserve_path(return_shift=h) - reserve_path(return_shift=-h)
+        ),
+    }
+    for name, difference in checks.items():
+        np.testing.assert_allclose(
+            result["sensitivity"][name]["reserve_path"],
+            difference / (2 * h),
+            rtol=1e-4,
+            atol=1e-6 * np.abs(result["nominal_reserve_fund"]).max(),
+            err_msg=name,
+        )
+    print("전진모드 민감도가 유한차분 결과와 일치합니다.")
+
+
 # 사용 예시
 def test_simulation():
     """시뮬레이션 테스트 함수"""
@@ -194,7 +899,135 @@ def test_simulation():
     print(f"기금 소진: {result_higher_contribution['depletion_year']}년")
 
 
-def run_multiple_simulations():
+_worker_model = None  # 병렬 실행 워커 프로세스별 재사용 모델
+
+
+def _init_sweep_worker(trace=False):
+    global _worker_model
+    tracing.disable()  # fork로 복사된 부모 프로세스의 추적기는 버림
+    if trace:
+        tracing.enable()
+    _worker_model = NationalPensionModel()
+
+
+def _run_sweep_chunk(cells):
+    """셀 묶음 시뮬레이션 결과와 (추적 중이면) 워커의 단계별 기록 반환"""
+    with stage("sweep_chunk", cells=len(cells)):
+        results = [
+            run_single_simulation(cont_rate, inc_replace, model=_worker_model)
+            for cont_rate, inc_replace in cells
+        ]
+    tracer = tracing.active()
+    return results, tracer.drain() if tracer is not None else []
+
+
+def run_parallel_sweep(
+    cells, workers=None, chunk_size=None, progress=True, on_chunk=None
+):
+    """(보험료율, 소득대체율) 셀 목록을 프로세스 풀에서 병렬 시뮬레이션
+
+    셀을 chunk_size개씩 묶어 워커에 배분하며, 워커는 모델 하나를 재사용한다.
+    결과는 cells 순서대로 반환하고, progress=True이면 진행률과 처리속도를 출력한다.
+    on_chunk(셀 목록, 결과 목록)는 묶음이 끝나는 순서대로 호출된다 (결과 추가 저장 등).
+    추적이 켜져 있으면(tracing.enable) 워커의 단계별 기록도 현재 추적기에 합친다.
+    """
+    workers = workers or os.cpu_count()
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(cells) / (workers * 4)))
+    chunks = [cells[i : i + chunk_size] for i in range(0, len(cells), chunk_size)]
+
+    chunk_results = [None] * len(chunks)
+    done = 0
+    start_time = time.perf_counter()
+    tracer = tracing.active()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_sweep_worker,
+        initargs=(tracer is not None,),
+    ) as executor:
+        futures = {
+            executor.submit(_run_sweep_chunk, chunk): i for i, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            chunk_results[i], events = future.result()
+            if tracer is not None:
+                tracer.merge(events)
+            if on_chunk is not None:
+                on_chunk(chunks[i], chunk_results[i])
+            done += len(chunks[i])
+            if progress:
+                elapsed = time.perf_counter() - start_time
+                print(
+                    f"진행 {done}/{len(cells)} 시나리오 ({done / elapsed:.1f} scenarios/sec)"
+                )
+
+    return [result for results in chunk_results for result in results]
+
+
+def run_stored_sweep(
+    cells, store, workers=1, chunk_size=None, batch_size=2048, on_chunk=None
+):
+    """저장소(sweep_store.SweepStore)에 없는 셀만 시뮬레이션하고 끝나는 대로 저장
+
+    cells는 iterator여도 되며 batch_size개씩 읽어 처리하므로 격자 크기와 관계없이
+    메모리 사용량이 일정하다. 중단 후 다시 실행하면 저장된 셀은 건너뛴다.
+    반환값: {"computed": 계산한 셀 수, "skipped": 건너뛴 셀 수}
+    """
+    cells = iter(cells)
+    computed = skipped = 0
+    model = None
+    start_time = time.perf_counter()
+
+    def save(finished_cells, finished_results):
+        store.put_many(finished_cells, finished_results)
+        if on_chunk is not None:
+            on_chunk(finished_cells, finished_results)
+
+    while batch := list(islice(cells, batch_size)):
+        pending = store.pending(batch)
+        skipped += len(batch) - len(pending)
+        if not pending:
+            continue
+
+        if workers == 1:
+            model = model or NationalPensionModel()
+            for cell in pending:
+                save([cell], [run_single_simulation(*cell, model=model)])
+        else:
+            run_parallel_sweep(
+                pending,
+                workers=workers,
+                chunk_size=chunk_size,
+                progress=False,
+                on_chunk=save,
+            )
+        computed += len(pending)
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"계산 {computed}, 건너뜀 {skipped} 시나리오 ({computed / elapsed:.1f} scenarios/sec)"
+        )
+
+    print(f"완료: 계산 {computed}, 건너뜀 {skipped} 시나리오")
+    return {"computed": computed, "skipped": skipped}
+
+
+def run_multiple_simulations(
+    workers=1,
+    chunk_size=None,
+    save_csv=True,
+    results_dir=None,
+    results_format="parquet",
+    store=None,
+):
+    """보험료율 × 소득대체율 시나리오 시뮬레이션 (workers > 1이면 프로세스 병렬 실행)
+
+    save_csv=False이면 결과 CSV 파일을 만들지 않는다 (벤치마크 등).
+    results_dir를 주면 끝난 시나리오부터 열 단위 파일(results_io, pyarrow 필요)로
+    추가 저장한다 (results_format: "parquet" 또는 "arrow").
+    store(SQLite 파일 경로)를 주면 셀마다 결과를 저장하고, 다시 실행할 때 이미
+    계산된 셀은 건너뛴다 (run_stored_sweep).
+    """
 
     # 시뮬레이션할 보험료율과 소득대체율 조합
     contribution_rates = [
@@ -203,31 +1036,73 @@ def run_multiple_simulations():
     income_replacements = [
         round(x, 2) for x in np.arange(0.40, 0.51, 0.01)
     ]  # 40%부터 0.01씩 증가하여 50%까지
+    cells = [
+        (cont_rate, inc_replace)
+        for cont_rate in contribution_rates
+        for inc_replace in income_replacements
+    ]
 
-    results = []
+    writer = None
+    if results_dir is not None:
+        from results_io import ResultsWriter
+
+        writer = ResultsWriter(results_dir, fmt=results_format)
 
-    for cont_rate in contribution_rates:
-        for inc_replace in income_replacements:
+    def save_finished(finished_cells, finished_results):
+        if writer is not None:
+            writer.append_simulation(
+                [
+                    _simulation_row(cont_rate, inc_replace, result)
+                    for (cont_rate, inc_replace), result in zip(
+                        finished_cells, finished_results
+                    )
+                ]
+            )
+
+    if store is not None:
+        from sweep_store import SweepStore
+
+        with SweepStore(store) as sweep_store:
+            run_stored_sweep(
+                cells,
+                sweep_store,
+                workers=workers,
+                chunk_size=chunk_size,
+                on_chunk=save_finished,
+            )
+            df_results = sweep_store.to_frame(cells)
+        sweep_results = None
+    elif workers == 1:
+        sweep_results = []
+        for i, (cont_rate, inc_replace) in enumerate(cells):
             # 시뮬레이션 실행
             print(
                 f"Running simulation for contribution rate: {cont_rate * 100:.0f}%, income replacement: {inc_replace * 100:.0f}%"
             )
+            with stage(
+                "scenario", contribution_rate=cont_rate, income_replacement=inc_replace
+            ):
+                sweep_results.append(
+                    run_pension_simulation(cont_rate, inc_replace, sensitivity=False)
+                )
+            # 보험료율 한 줄이 끝날 때마다 추가 저장
+            if (i + 1) % len(income_replacements) == 0:
+                row_start = i + 1 - len(income_replacements)
+                save_finished(cells[row_start : i + 1], sweep_results[row_start:])
+    else:
+        sweep_results = run_parallel_sweep(
+            cells, workers=workers, chunk_size=chunk_size, on_chunk=save_finished
+        )
 
-            result = run_pension_simulation(cont_rate, inc_replace, sensitivity=False)
-            # 결과 저장
-            results.append(
-                {
-                    "contribution_rate": cont_rate * 100,  # 퍼센트로 변환
-                    "income_replacement": inc_replace * 100,  # 퍼센트로 변환
-                    "max_reserve": result["max_reserve"],
-                    "max_reserve_year": result["max_reserve_year"],
-                    "first_deficit_year": result["first_deficit_year"],
-                    "depletion_year": result["depletion_year"],
-                }
-            )
+    if sweep_results is not None:
+        # 결과 저장
+        results = [
+            _simulation_row(cont_rate, inc_replace, result)
+            for (cont_rate, inc_replace), result in zip(cells, sweep_results)
+        ]
 
-    # DataFrame 생성
-    df_results = pd.DataFrame(results)
+        # DataFrame 생성
+        df_results = pd.DataFrame(results)
 
     # 결과 출력
     print("\n연금 재정 시뮬레이션 결과:")
@@ -241,13 +1116,71 @@ def run_multiple_simulations():
         print(f"  기금 소진: {row['depletion_year']}년")
 
     # CSV 파일로 저장
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_filename = f"csv/simulation_results_{timestamp}.csv"
-    df_results.to_csv(csv_filename, index=False)
+    if save_csv:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_filename = f"csv/simulation_results_{timestamp}.csv"
+        df_results.to_csv(csv_filename, index=False)
 
     return df_results
 
 
+def _simulation_row(contribution_rate, income_replacement, result):
+    return {
+        "contribution_rate": contribution_rate * 100,  # 퍼센트로 변환
+        "income_replacement": income_replacement * 100,  # 퍼센트로 변환
+        "max_reserve": result["max_reserve"],
+        "max_reserve_year": result["max_reserve_year"],
+        "first_deficit_year": result["first_deficit_year"],
+        "depletion_year": result["depletion_year"],
+    }
+
+
+def test_parallel_sweep(workers=4):
+    """병렬 시나리오 시뮬레이션 결과가 순차 실행 결과와 값/자료형까지 같은지 확인"""
+    serial = run_multiple_simulations(workers=1, save_csv=False)
+    parallel = run_multiple_simulations(workers=workers, save_csv=False)
+    pd.testing.assert_frame_equal(parallel, serial)  # 열 자료형(check_dtype) 포함
+    print(f"병렬 실행(workers={workers}) 결과가 순차 실행 결과와 일치합니다.")
+
+
 if __name__ == "__main__":
-    df_result = run_multiple_simulations()
+    from results_io import has_pyarrow
+    from visualization import create_simulation_visualizations
+
+    parser = argparse.ArgumentParser(description="보험료율 × 소득대체율 시나리오 시뮬레이션")
+    parser.add_argument("--workers", type=int, default=1, help="병렬 프로세스 수")
+    parser.add_argument("--store", help="셀별 결과 SQLite 파일 (중단 후 이어서 실행)")
+    parser.add_argument("--csv", action="store_true", help="CSV 파일로도 저장")
+    parser.add_argument(
+        "--monte-carlo",
+        type=int,
+        metavar="N",
+        help="기본 정책(9%%, 40%%)의 투자수익률 경로 N개 몬테카를로 시뮬레이션만 실행",
+    )
+    parser.add_argument(
+        "--return-model", choices=list(RETURN_MODELS), default="normal", help="수익률 모형"
+    )
+    parser.add_argument("--seed", type=int, help="몬테카를로 난수 seed")
+    args = parser.parse_args()
+
+    if args.monte_carlo:
+        result = run_return_monte_carlo(
+            n_paths=args.monte_carlo, return_model=args.return_model, seed=args.seed
+        )
+        print(f"수익률 모형 {args.return_model}, 경로 {args.monte_carlo}개")
+        print(result["summary"].to_string(float_format="{:.1f}".format))
+        for year, probability in zip(result["years"], result["depletion_probability"]):
+            if year % 10 == 0:
+                print(f"{year}년까지 기금 소진 확률: {probability:.1%}")
+        raise SystemExit
+
+    # pyarrow가 있으면 열 단위 파일로 저장 (CSV는 --csv 옵션이거나 pyarrow가 없을 때)
+    columnar = has_pyarrow()
+    run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    df_result = run_multiple_simulations(
+        workers=args.workers,
+        save_csv=not columnar or args.csv,
+        results_dir=f"results/simulation_{run_timestamp}" if columnar else None,
+        store=args.store,
+    )
     create_simulation_visualizations(df_result)
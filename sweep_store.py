@@ -0,0 +1,215 @@
+"""시나리오 시뮬레이션 결과의 재개 가능한 저장소 (SQLite)
+
+셀(보험료율, 소득대체율)마다 결과를 끝나는 즉시 저장하므로 중단되어도 다시 실행하면
+이미 끝난 셀은 건너뛴다. 결과는 가정 fingerprint(NationalPensionModel.assumption_fingerprint)
+별로 구분되어, 가정이 바뀌면 새로 계산한다.
+
+    store = SweepStore("csv/simulation_store.sqlite")
+    run_stored_sweep(cells, store, workers=4)
+    df = store.to_frame(cells)
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+RATE_DIGITS = 10  # 셀 키 반올림 자릿수 (0.07 * 100 / 100 등의 오차 제거)
+
+RESULT_COLUMNS = [
+    "max_reserve",
+    "max_reserve_year",
+    "first_deficit_year",
+    "depletion_year",
+]
+
+
+def _key(contribution_rate, income_replacement):
+    return (
+        round(float(contribution_rate), RATE_DIGITS),
+        round(float(income_replacement), RATE_DIGITS),
+    )
+
+
+class SweepStore:
+    """(가정 fingerprint, 보험료율, 소득대체율) -> 시뮬레이션 결과 저장소
+
+    보험료율/소득대체율은 비율(0.09, 0.40) 단위이며 run_single_simulation 결과를 저장한다.
+    """
+
+    def __init__(self, path, fingerprint=None):
+        if fingerprint is None:
+            from NPS_model import NationalPensionModel
+
+            fingerprint = NationalPensionModel().assumption_fingerprint()
+        self.path = path
+        self.fingerprint = fingerprint
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scenario_results (
+                fingerprint TEXT NOT NULL,
+                contribution_rate REAL NOT NULL,
+                income_replacement REAL NOT NULL,
+                max_reserve REAL,
+                max_reserve_year INTEGER,
+                first_deficit_year INTEGER,
+                depletion_year INTEGER,
+                finished_at TEXT NOT NULL,
+                PRIMARY KEY (fingerprint, contribution_rate, income_replacement)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        (count,) = self.conn.execute(
+            "SELECT COUNT(*) FROM scenario_results WHERE fingerprint = ?",
+            (self.fingerprint,),
+        ).fetchone()
+        return count
+
+    def pending(self, cells):
+        """cells 중 아직 저장되지 않은 셀 목록 (입력 순서 유지)"""
+        cells = list(cells)
+        done = set()
+        # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회
+        for start in range(0, len(cells), 400):
+            keys = [_key(*cell) for cell in cells[start : start + 400]]
+            placeholders = ",".join(["(?, ?)"] * len(keys))
+            rows = self.conn.execute(
+                f"""
+                SELECT contribution_rate, income_replacement FROM scenario_results
+                WHERE fingerprint = ?
+                AND (contribution_rate, income_replacement) IN (VALUES {placeholders})
+                """,
+                [self.fingerprint, *(value for key in keys for value in key)],
+            )
+            done.update(rows)
+        return [cell for cell in cells if _key(*cell) not in done]
+
+    def put(self, cell, result):
+        self.put_many([cell], [result])
+
+    def put_many(self, cells, results):
+        """셀별 결과 저장 (한 트랜잭션으로 커밋)"""
+        finished_at = datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO scenario_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        self.fingerprint,
+                        *_key(*cell),
+                        *(_sql_value(result[column]) for column in RESULT_COLUMNS),
+                        finished_at,
+                    )
+                    for cell, result in zip(cells, results)
+                ],
+            )
+
+    def get(self, contribution_rate, income_replacement):
+        """저장된 결과 dict (없으면 None)"""
+        row = self.conn.execute(
+            f"""
+            SELECT {", ".join(RESULT_COLUMNS)} FROM scenario_results
+            WHERE fingerprint = ? AND contribution_rate = ? AND income_replacement = ?
+            """,
+            (self.fingerprint, *_key(contribution_rate, income_replacement)),
+        ).fetchone()
+        return None if row is None else dict(zip(RESULT_COLUMNS, row))
+
+    def iter_results(self):
+        """저장된 (보험료율, 소득대체율, 결과) 를 차례로 반환 (전체를 메모리에 올리지 않음)"""
+        cursor = self.conn.execute(
+            f"""
+            SELECT contribution_rate, income_replacement, {", ".join(RESULT_COLUMNS)}
+            FROM scenario_results WHERE fingerprint = ?
+            ORDER BY contribution_rate, income_replacement
+            """,
+            (self.fingerprint,),
+        )
+        for contribution_rate, income_replacement, *values in cursor:
+            yield contribution_rate, income_replacement, dict(zip(RESULT_COLUMNS, values))
+
+    def to_frame(self, cells=None):
+        """run_multiple_simulations 형식(퍼센트 단위) DataFrame (cells를 주면 그 순서의 셀만)"""
+        if cells is None:
+            items = self.iter_results()
+        else:
+            items = (
+                (cont_rate, inc_replace, self.get(cont_rate, inc_replace))
+                for cont_rate, inc_replace in cells
+            )
+        return pd.DataFrame(
+            [
+                {
+                    "contribution_rate": cont_rate * 100,
+                    "income_replacement": inc_replace * 100,
+                    **result,
+                }
+                for cont_rate, inc_replace, result in items
+                if result is not None
+            ],
+            columns=["contribution_rate", "income_replacement", *RESULT_COLUMNS],
+        )
+
+
+def _sql_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "item"):  # numpy 스칼라
+        return value.item()
+    return value
+
+
+def test_sweep_store(tmp_dir=None):
+    """중단 후 재실행과 격자 확장 시 저장된 셀을 건너뛰는지 확인"""
+    import contextlib
+    import io
+    import os
+    import tempfile
+    from itertools import product
+
+    from simulation import run_single_simulation, run_stored_sweep
+
+    contribution_rates = [0.08, 0.09, 0.10]
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as root:
+        path = os.path.join(root, "sweep.sqlite")
+        with SweepStore(path) as store, contextlib.redirect_stdout(io.StringIO()):
+            # 중단된 실행: 첫 2개 셀만 저장됨
+            cells = list(product(contribution_rates, [0.40, 0.41]))
+            store.put_many(
+                cells[:2], [run_single_simulation(*cell) for cell in cells[:2]]
+            )
+            assert run_stored_sweep(iter(cells), store, batch_size=4) == {
+                "computed": 4,
+                "skipped": 2,
+            }
+
+            # 소득대체율 42% 추가: 새 셀만 계산
+            cells = list(product(contribution_rates, [0.40, 0.41, 0.42]))
+            assert run_stored_sweep(cells, store) == {"computed": 3, "skipped": 6}
+            assert len(store) == 9
+
+            expected = run_single_simulation(0.10, 0.42)
+            assert store.get(0.1, 0.42) == expected, (store.get(0.1, 0.42), expected)
+            assert len(store.to_frame(cells)) == 9
+
+        # 가정이 바뀌면 다시 계산
+        with SweepStore(path, fingerprint="other") as store:
+            assert store.pending(cells) == cells
+    print("시나리오 저장소가 저장된 셀을 건너뛰고 새 셀만 계산합니다.")
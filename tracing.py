@@ -0,0 +1,208 @@
+"""단계별 실행 시간 추적 (opt-in)
+
+    tracer = tracing.enable()
+    model.run_projection()
+    tracer.print_summary()                  # 단계별 호출 수/시간 표
+    tracer.save_chrome_trace("trace.json")  # chrome://tracing, Perfetto에서 열기
+    tracing.disable()
+
+NPS_TRACE 환경변수에 파일 경로를 지정하면 (예: NPS_TRACE=trace.json python NPS_model.py)
+메인 프로세스에서 추적을 켜고, 종료 시 요약 표 출력과 Chrome trace 저장을 한다.
+추적을 켜지 않으면 stage()는 공용 빈 context manager를 반환하여 부담이 거의 없다.
+"""
+
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+_NULL_SPAN = nullcontext()
+_tracer = None  # 현재 프로세스의 활성 추적기
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        self.tracer.events.append(
+            (
+                self.name,
+                self.start,
+                end - self.start,
+                self.tracer.pid,
+                threading.get_ident(),
+                self.args,
+            )
+        )
+        return False
+
+
+class StageTracer:
+    """단계별 실행 구간 기록기
+
+    events: (단계명, 시작 ns, 소요 ns, pid, tid, args) 목록.
+    시각은 time.perf_counter_ns 기준이며, 워커 프로세스의 기록은 merge로 합친다.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.events = []
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    def drain(self):
+        """기록을 반환하고 비움 (워커 프로세스에서 결과와 함께 전달)"""
+        events, self.events = self.events, []
+        return events
+
+    def merge(self, events):
+        self.events.extend(events)
+
+    def summary(self, by=("stage",)):
+        """단계별 호출 수와 소요 시간 DataFrame (by에 "year" 등 args 키 추가 가능)"""
+        import pandas as pd
+
+        columns = list(by)
+        rows = [
+            {
+                **{
+                    key: name if key == "stage" else args.get(key)
+                    for key in columns
+                },
+                "duration": duration / 1e9,
+            }
+            for name, _, duration, _, _, args in self.events
+        ]
+        if not rows:
+            return pd.DataFrame(
+                columns=columns + ["calls", "total_s", "mean_ms", "max_ms"]
+            )
+
+        grouped = pd.DataFrame(rows).groupby(columns, sort=False, dropna=False)[
+            "duration"
+        ]
+        table = grouped.agg(calls="count", total_s="sum", mean_ms="mean", max_ms="max")
+        table[["mean_ms", "max_ms"]] *= 1000
+        return table.reset_index().sort_values("total_s", ascending=False)
+
+    def print_summary(self, by=("stage",)):
+        print(self.summary(by).to_string(index=False, float_format="{:.4f}".format))
+
+    def to_chrome_trace(self):
+        """Chrome Trace Event 형식 dict (완료 이벤트 "X", 시간 단위 us)"""
+        trace_events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {key: _json_value(value) for key, value in args.items()},
+            }
+            for name, start, duration, pid, tid, args in self.events
+        ]
+        for pid in sorted({event[3] for event in self.events}):
+            trace_events.append(
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "args": {"name": "main" if pid == self.pid else f"worker {pid}"},
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+
+def _json_value(value):
+    if hasattr(value, "item"):  # numpy 스칼라
+        return value.item()
+    return value
+
+
+def enable():
+    """현재 프로세스에서 추적을 켜고 추적기 반환 (이미 켜져 있으면 그 추적기)"""
+    global _tracer
+    if _tracer is None:
+        _tracer = StageTracer()
+    return _tracer
+
+
+def disable():
+    """추적을 끄고 그동안의 추적기 반환"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def active():
+    """활성 추적기 (꺼져 있으면 None)"""
+    return _tracer
+
+
+def stage(name, **args):
+    """단계 구간 context manager (추적이 꺼져 있으면 아무 일도 하지 않음)"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, args)
+
+
+def _export_at_exit(path):
+    tracer = disable()
+    if tracer is None or not tracer.events:
+        return
+    tracer.print_summary()
+    tracer.save_chrome_trace(path)
+    print(f"추적 결과 저장: {path}")
+
+
+if os.environ.get("NPS_TRACE") and multiprocessing.parent_process() is None:
+    enable()
+    atexit.register(_export_at_exit, os.environ["NPS_TRACE"])
+
+
+def test_tracing():
+    """재정추계 단계별 기록, 요약 표, Chrome trace 형식 확인"""
+    from NPS_model import NationalPensionModel
+
+    global _tracer
+    model = NationalPensionModel()
+    previous, _tracer = _tracer, StageTracer()
+    try:
+        model.run_projection()
+        tracer = _tracer
+    finally:
+        _tracer = previous
+
+    table = tracer.summary().set_index("stage")
+    for name in ["demographic", "economic", "subscriber", "benefit", "finance"]:
+        assert table.loc[name, "calls"] == model.end_year - model.start_year + 1, name
+    assert table.loc["run_projection", "calls"] == 1
+
+    by_year = tracer.summary(by=("stage", "year"))
+    assert set(by_year["year"].dropna()) == set(
+        range(model.start_year, model.end_year + 1)
+    )
+
+    trace = json.loads(json.dumps(tracer.to_chrome_trace()))
+    assert all(event["ph"] in ("X", "M") for event in trace["traceEvents"])
+    assert stage("disabled") is _NULL_SPAN
+    print("단계별 추적이 정상 동작합니다.")